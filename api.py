@@ -3,6 +3,7 @@ FastAPI application for generating financial presentation PDFs.
 Deploy to Railway with: railway up
 """
 import time
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
 import os
@@ -19,12 +20,22 @@ from financial_models import (
     GeneratePDFResponse,
 )
 from commentary import generate_slide_commentary
+from openai_service import close_ai_service
 from generate_real_charts_pdf import generate_pdf_from_slides
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Release the shared AIService connection pool
+    await close_ai_service()
+
+
 app = FastAPI(
     title="Financial Presentation Generator API",
     description="Generate professional financial presentations from structured KPI data",
     version="2.0.0",
+    lifespan=lifespan,
 )
 
 # CORS — allow all origins (restrict to known domains in production)
@@ -6,7 +6,7 @@ import json
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Tuple, Optional
 
-from openai_service import AIService
+from openai_service import AIService, get_ai_service
 from financial_models import (
     SlideInput,
     SlideOutput,
@@ -125,7 +125,7 @@ def generate_slide_commentary(
 
     Returns a list of SlideOutput in the same order as slides_input.
     """
-    ai = AIService()
+    ai = get_ai_service()
 
     # Build flat task list: (slide_idx, rc_idx_or_None)
     # rc_idx None → KPI-level task; int → root-cause task
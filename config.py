@@ -30,9 +30,21 @@ class Config:
         self.groq_model: str = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
         self.groq_base_url: str = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1")
 
+        # Optional cheaper model for structured slide-data extraction; when
+        # unset the provider model above is used for every call
+        self.extraction_model: Optional[str] = os.getenv("EXTRACTION_MODEL") or None
+        # Schema-constrained output (OpenAI json_schema response_format); only
+        # gpt-4o-2024-08-06 and newer accept it, so it is opt-in
+        self.structured_output: bool = os.getenv("STRUCTURED_OUTPUT", "false").lower() in ("1", "true", "yes")
+
         # Common settings
         self.temperature: float = float(os.getenv("TEMPERATURE", "0.7"))
         self.max_tokens: int = int(os.getenv("MAX_TOKENS", "4000"))
+        # Upper bound on concurrent async API requests (provider rate limits)
+        self.max_concurrent_requests: int = int(os.getenv("MAX_CONCURRENT_REQUESTS", "4"))
+        # Retries for rate limits (429), 5xx and connection errors; the SDK
+        # backs off exponentially with jitter between attempts
+        self.max_retries: int = int(os.getenv("MAX_RETRIES", "3"))
 
     def validate(self) -> bool:
         if self.provider == "openai":
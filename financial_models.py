@@ -1,8 +1,8 @@
 """
 Financial data models for report generation.
 """
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from typing import List, Optional, Union
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 
 
@@ -135,3 +135,57 @@ class GeneratePDFRequest(BaseModel):
 
 class GeneratePDFResponse(BaseModel):
     pdf_url: str
+
+
+# ── Slide extraction models (structured AI output) ────────────────────────────
+
+class ChartPoint(BaseModel):
+    name: str
+    series1: Union[int, float] = 0
+    series2: Union[int, float] = 0
+    series3: Union[int, float] = 0
+
+
+class KPIChange(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    pct: float
+    from_value: Optional[float] = Field(default=None, alias="from")
+    to: Optional[float] = None
+
+
+class MetricKPIs(BaseModel):
+    vs_previous: Optional[KPIChange] = None
+    yoy: Optional[KPIChange] = None
+    previous_label: Optional[str] = None
+    latest_label: Optional[str] = None
+    yoy_previous_label: Optional[str] = None
+    yoy_latest_label: Optional[str] = None
+
+
+class Metric(BaseModel):
+    name: str
+    value: str
+    label: Optional[str] = None
+    kpis: Optional[MetricKPIs] = None
+    bullet_points: List[str] = Field(default_factory=list)
+    chart_data: List[ChartPoint] = Field(default_factory=list)
+
+
+class ReportData(BaseModel):
+    title: Optional[str] = None
+    subtitle: Optional[str] = None
+    date: Optional[str] = None
+    metrics: List[Metric] = Field(default_factory=list)
+
+
+class CategorizedMetric(Metric):
+    category: str  # "revenue", "profitability" or "operational"
+
+
+class MetricsExtraction(BaseModel):
+    metrics: List[CategorizedMetric] = Field(default_factory=list)
+
+
+class ReportBatch(BaseModel):
+    reports: List[ReportData] = Field(default_factory=list)
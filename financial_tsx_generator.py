@@ -4,57 +4,1586 @@ Generate professional TSX slide components for financial reports.
 Uses the professional slide template format.
 """
 import json
+import hashlib
+import logging
+import os
 import asyncio
-from typing import List, Dict, Any
+import html
+import math
+from typing import Callable, Coroutine, List, Dict, Any, Optional, Tuple, Type, TypeVar
 from pathlib import Path
 from datetime import datetime
 import re
-from concurrent.futures import ThreadPoolExecutor
 import threading
+import zipfile
+from string import Template
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+from json_repair import repair_json
+from pydantic import BaseModel, ValidationError
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib fallback emits the same literals
+    orjson = None
+
+try:
+    import diskcache
+except ImportError:  # optional; completions are then only cached in memory
+    diskcache = None
+
+from openai_service import get_ai_service
+from financial_models import FinancialReportData, TrendAnalysis, PeriodComparison, Metric, MetricsExtraction, ReportBatch, ReportData
+
+# Full AI responses, per-point extraction details and per-metric sort/KPI
+# notes are only useful when diagnosing parsing issues; they are logged at
+# DEBUG so production skips them
+logger = logging.getLogger(__name__)
+
+
+# Client-only wrapper so recharts is split out of the initial bundle and only
+# loaded once the comparison slide actually mounts.
+_LAZY_COMPARISON_SLIDE_TSX = '''import dynamic from "next/dynamic";
+
+const ChartSkeleton = () => (
+  <div className="aspect-video max-w-[1280px] w-full bg-gray-100 animate-pulse" />
+);
+
+const FinancialComparisonSlide = dynamic(() => import("./FinancialComparisonSlide"), {
+  ssr: false,
+  loading: () => <ChartSkeleton />,
+});
+
+export default FinancialComparisonSlide;
+'''
 
-from openai_service import AIService
-from financial_models import FinancialReportData, TrendAnalysis, PeriodComparison
+# Title and per-metric statistic slides; string.Templates like the
+# comparison slide below, so the JSX needs no brace escaping.
+_TITLE_SLIDE_TSX = Template('''import * as z from "zod";
+import { ImageSchema } from "../defaultSchemes";
+
+export const layoutName = "Financial Report Title";
+export const layoutId = "financial-title-slide";
+export const layoutDescription = "Title slide for financial analysis report";
+
+export const Schema = z.object({
+  organizationName: z.string().default("Financial Analysis"),
+  primaryTitle: z.string().default("${primary_title}"),
+  secondaryTitle: z.string().default("${secondary_title}"),
+  brandLogo: ImageSchema.default({
+    __image_url__: "https://via.placeholder.com/40x40/14B8A6/FFFFFF?text=FA",
+    __image_prompt__: "Financial analytics logo with chart symbol"
+  }),
+  contactDetails: z.object({
+    phoneNumber: z.string().default("+1-234-567-8900"),
+    physicalAddress: z.string().default("West London, UK"),
+    websiteUrl: z.string().default("www.app.DashAnalytix.com")
+  }).default({
+    phoneNumber: "+1-234-567-8900",
+    physicalAddress: "West London, UK",
+    websiteUrl: "www.app.DashAnalytix.com"
+  }),
+  presentationDate: z.string().default("${presentation_date}"),
+  showDecorations: z.boolean().default(true),
+  showNavigationArrow: z.boolean().default(true),
+});
+
+type SchemaType = z.infer<typeof Schema>;
+
+const FinancialTitleSlide = ({ data }: { data: Partial<SchemaType> }) => {
+  const {
+    organizationName,
+    primaryTitle,
+    secondaryTitle,
+    brandLogo,
+    contactDetails,
+    presentationDate,
+    showDecorations,
+    showNavigationArrow,
+  } = data;
+
+  return (
+    <div className="aspect-video max-w-[1280px] w-full bg-white relative overflow-hidden">
+      <div className="absolute top-0 left-0 right-0 px-16 py-8 flex justify-between items-center z-20">
+        <div className="flex items-center space-x-3">
+          {brandLogo?.__image_url__ && (
+            <div className="w-10 h-10">
+              <img src={brandLogo.__image_url__} alt={brandLogo.__image_prompt__} className="w-full h-full object-contain" />
+            </div>
+          )}
+          {organizationName && <span className="text-2xl font-bold text-gray-900">{organizationName}</span>}
+        </div>
+        {showNavigationArrow && (
+          <div className="w-12 h-12 bg-teal-600 rounded-full flex items-center justify-center">
+            <svg className="w-6 h-6 text-white" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+              <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M9 5l7 7-7 7" />
+            </svg>
+          </div>
+        )}
+      </div>
+
+      {showDecorations && <div className="absolute top-20 right-16 w-96 h-96 bg-yellow-100 rounded-full opacity-60 z-10"></div>}
+
+      <div className="relative h-full flex flex-col justify-center px-16">
+        <div>
+          {primaryTitle && <h1 className="text-4xl lg:text-5xl font-black text-teal-700 leading-none tracking-tight mb-4">{primaryTitle}</h1>}
+          {secondaryTitle && (
+            <div className="flex items-center space-x-4 mb-12">
+              <div className="w-4 h-4 bg-teal-600 rounded-full"></div>
+              <h2 className="text-xl font-bold text-gray-800 tracking-wide">{secondaryTitle}</h2>
+            </div>
+          )}
+        </div>
+      </div>
+
+      <div className="absolute bottom-0 left-0 right-0 px-16 py-8 border-t-2 border-gray-300">
+        <div className="flex justify-between items-center text-gray-700">
+          <div className="flex space-x-16 text-sm">
+            {contactDetails?.phoneNumber && (
+              <div><div className="font-semibold text-gray-900 mb-1">Telephone</div><div>{contactDetails.phoneNumber}</div></div>
+            )}
+            {contactDetails?.physicalAddress && (
+              <div><div className="font-semibold text-gray-900 mb-1">Address</div><div>{contactDetails.physicalAddress}</div></div>
+            )}
+            {contactDetails?.websiteUrl && (
+              <div><div className="font-semibold text-gray-900 mb-1">Website</div><div>{contactDetails.websiteUrl}</div></div>
+            )}
+          </div>
+          {presentationDate && <div className="text-right"><div className="text-lg font-bold text-gray-900">{presentationDate}</div></div>}
+        </div>
+      </div>
+    </div>
+  );
+};
+
+export default FinancialTitleSlide;
+''')
+
+_STATISTIC_SLIDE_TSX = Template('''import React from "react";
+import * as z from "zod";
+import { ImageSchema } from "../defaultSchemes";
+import { ChartContainer, ChartTooltip, ChartTooltipContent } from "@/components/ui/chart";
+import { LineChart, Line, XAxis, YAxis, CartesianGrid } from "recharts";
+
+export const layoutName = "${metric_name} Statistics";
+export const layoutId = "${layout_slug}-statistic-slide";
+export const layoutDescription = "Financial statistics for ${metric_name}";
+
+export const Schema = z.object({
+  sectionTitle: z.string().default("${section_title}"),
+  sectionSubtitle: z.string().default("FINANCIAL PERFORMANCE ANALYSIS"),
+  statisticValue: z.string().default("${statistic_value}"),
+  statisticLabel: z.string().default("${statistic_label}"),
+  // KPI fields (populated from computed time-series)
+  kpiPrevPercent: z.string().default("${kpi_prev_percent}"),
+  kpiPrevLabel: z.string().default("${kpi_prev_label}"),
+  kpiYoyPercent: z.string().default("${kpi_yoy_percent}"),
+  kpiYoyLabel: z.string().default("${kpi_yoy_label}"),
+  supportingVisual: ImageSchema.default({
+    __image_url__: "https://images.unsplash.com/photo-1460925895917-afdab827c52f?w=800&q=80",
+    __image_prompt__: "Financial analytics dashboard with charts and data"
+  }),
+  bulletPoints: z.array(z.string()).default(${bullet_points}),
+  chartData: z.array(z.object({
+    name: z.string(),
+    series1: z.number(),
+    series2: z.number(),
+    series3: z.number(),
+  })).default(${chart_data}),
+  showYellowUnderline: z.boolean().default(true),
+  showVisualAccents: z.boolean().default(true),
+});
+
+const chartConfig = {
+  series1: { label: "Value", color: "#061551" },
+  series2: { label: "Trend", color: "#0e68b3" },
+  series3: { label: "Target", color: "#32bbd8" },
+};
+
+type SchemaType = z.infer<typeof Schema>;
+
+// Hoisted so recharts sees the same prop objects on every render
+const CHART_MARGIN = { top: 10, right: 20, left: 0, bottom: 30 };
+const TICK_STYLE = { fontSize: 12, fill: "#666" };
+const LINE_DOT = { fill: "#0e68b3", strokeWidth: 2, r: 4 };
+const BULLET_DOT_COLORS = ["bg-teal-600", "bg-yellow-300", "bg-gray-400"];
+
+const ${safe_name}StatisticSlide = ({ data }: { data: Partial<SchemaType> }) => {
+  const { sectionTitle, sectionSubtitle, statisticValue, statisticLabel, supportingVisual, bulletPoints, chartData, showYellowUnderline, showVisualAccents } = data;
+
+  return (
+    <div className="aspect-video max-w-[1280px] w-full bg-white relative overflow-hidden">
+      <div className="h-full flex">
+        <div className="w-1/2 relative bg-teal-600 px-16 py-12 flex flex-col text-white">
+          <div className="mb-8">
+            {sectionTitle && <h1 className="text-3xl lg:text-4xl font-black leading-tight mb-4">{sectionTitle}</h1>}
+            {sectionSubtitle && <p className="text-base font-semibold tracking-wide mb-4">{sectionSubtitle}</p>}
+            {showYellowUnderline && <div className="w-24 h-1 bg-yellow-300 mb-8"></div>}
+          </div>
+          
+          <div className="mb-8">
+            {statisticValue && <div className="text-8xl font-black text-yellow-300 mb-4">{statisticValue}</div>}
+            {statisticLabel && <h2 className="text-2xl font-bold">{statisticLabel}</h2>}
+          </div>
+          
+          {supportingVisual?.__image_url__ && (
+            <div className="flex-1 flex items-end">
+              <div className="w-full h-48">
+                <img src={supportingVisual.__image_url__} alt={supportingVisual.__image_prompt__} className="w-full h-full object-cover rounded-lg" />
+              </div>
+            </div>
+          )}
+          
+          {showVisualAccents && (
+            <>
+              <div className="absolute top-8 right-8 w-6 h-6 bg-yellow-300 rounded-full"></div>
+              <div className="absolute bottom-12 left-8 w-4 h-4 bg-yellow-200 rounded-full"></div>
+            </>
+          )}
+        </div>
+
+        <div className="w-1/2 relative bg-white px-16 py-12">
+          <div className="flex-1 px-8 pt-8">
+            <div className="flex items-center justify-end mb-4 space-x-4">
+              <div className="flex items-center space-x-2">
+                <div className="w-3 h-3 bg-yellow-300 rounded-full"></div>
+                <span className="text-sm text-gray-600">{chartConfig.series1.label}</span>
+              </div>
+            </div>
+            
+            {chartData && chartData.length > 0 && (
+              <div className="h-64">
+                <ChartContainer config={chartConfig} className="h-full w-full">
+                  <LineChart data={chartData} margin={CHART_MARGIN}>
+                    <CartesianGrid strokeDasharray="3 3" stroke="#f0f0f0" />
+                    <XAxis dataKey="name" axisLine={false} tickLine={false} tick={TICK_STYLE} />
+                    <YAxis axisLine={false} tickLine={false} tick={TICK_STYLE} />
+                    <ChartTooltip content={<ChartTooltipContent />} />
+                    <Line type="monotone" dataKey="series1" stroke="#0e68b3" strokeWidth={3} dot={LINE_DOT} />
+                  </LineChart>
+                </ChartContainer>
+              </div>
+            )}
+          </div>
+          
+          <div className="px-8 pb-6 space-y-4 mt-10">
+            {bulletPoints && bulletPoints.map((point, index) => {
+              const dotColor = BULLET_DOT_COLORS[index % BULLET_DOT_COLORS.length];
+              return (
+                <div key={index} className="flex items-start space-x-4">
+                  <div className={`w-6 h-6 $${dotColor} rounded-full flex-shrink-0 mt-1`}></div>
+                  <p className="text-base leading-relaxed text-gray-700">{point}</p>
+                </div>
+              );
+            })}
+          </div>
+        </div>
+      </div>
+      <div className="absolute bottom-0 left-0 right-0 h-3 bg-yellow-300"></div>
+    </div>
+  );
+};
+
+export default React.memo(${safe_name}StatisticSlide);
+''')
+
+def _specialize_template(template: Template, **fixed: str) -> Template:
+    """Bind some placeholders of a Template now, leaving the rest for substitute()."""
+    text = template.template
+    for name, value in fixed.items():
+        text = text.replace("${%s}" % name, value.replace("$", "$$"))
+    return Template(text)
+
+
+def _statistic_name_fields(metric_name: str) -> Dict[str, str]:
+    """Statistic-slide placeholders that depend only on the metric name."""
+    safe_name = metric_name.replace(" ", "")
+    return {
+        "metric_name": metric_name,
+        "safe_name": safe_name,
+        "layout_slug": safe_name.lower(),
+        "section_title": metric_name.upper(),
+    }
+
+
+# Metric names the extraction prompts ask for. Their statistic templates have
+# the name-derived fields filled in at import, leaving only the report data.
+_KNOWN_METRICS = (
+    "Income", "Revenue", "Gross Profit", "EBITDA", "Net Income", "Cost of Sale",
+    "Cost of Sales", "Expenses", "Operating Expenses", "Cash Flow",
+    "Collection Days", "Payment Days", "Inventory Days",
+)
+_STATISTIC_SLIDE_BY_METRIC: Dict[str, Template] = {
+    name: _specialize_template(_STATISTIC_SLIDE_TSX, **_statistic_name_fields(name))
+    for name in _KNOWN_METRICS
+}
+
+# Period-over-period comparison slide. A string.Template rather than an
+# f-string so the JSX braces need no escaping and the template is parsed once.
+_COMPARISON_SLIDE_TSX = Template('''import React from "react";
+import * as z from "zod";
+import { ImageSchema } from "../defaultSchemes";
+import { ChartContainer, ChartTooltip, ChartTooltipContent } from "@/components/ui/chart";
+import { BarChart, Bar, AreaChart, Area, XAxis, YAxis, CartesianGrid } from "recharts";
+
+type ChartPoint = { name: string; series1: number; series2: number; series3: number };
+
+const DEFAULT_BAR_DATA: ChartPoint[] = ${bar_chart_data};
+const DEFAULT_AREA_DATA: ChartPoint[] = ${area_chart_data};
+// Prerendered by the generator for the default data; null when disabled.
+const STATIC_BAR_SVG: string | null = ${bar_svg};
+const STATIC_AREA_SVG: string | null = ${area_svg};
+
+export const layoutName = "Financial Comparison";
+export const layoutId = "financial-comparison-slide";
+export const layoutDescription = "Period-over-period financial comparison";
+
+export const Schema = z.object({
+  sectionTitle: z.string().default("PERIOD COMPARISON"),
+  organizationName: z.string().default("Financial Analysis"),
+  brandLogo: ImageSchema.default({
+    __image_url__: "https://via.placeholder.com/40x40/14B8A6/FFFFFF?text=FA",
+    __image_prompt__: "Financial analytics logo"
+  }),
+  barChartData: z.array(z.object({
+    name: z.string(),
+    series1: z.number(),
+    series2: z.number(),
+    series3: z.number(),
+  })).default(DEFAULT_BAR_DATA),
+  areaChartData: z.array(z.object({
+    name: z.string(),
+    series1: z.number(),
+    series2: z.number(),
+    series3: z.number(),
+  })).default(DEFAULT_AREA_DATA),
+  leftChartTitle: z.string().default("${previous_label} vs ${current_label}"),
+  leftChartDescription: z.string().default("Period-over-period comparison showing key financial metrics and their changes."),
+  rightChartTitle: z.string().default("Cumulative Trend Analysis"),
+  rightChartDescription: z.string().default("Progressive financial performance showing cumulative growth and trends over time."),
+  rawFinancialText: z.string().default(""),
+});
+
+const chartConfig = {
+  series1: { label: "${period1_label}", color: "#061551" },
+  series2: { label: "${period2_label}", color: "#0e68b3" },
+  series3: { label: "Change", color: "#32bbd8" },
+};
+
+type SchemaType = z.infer<typeof Schema>;
+
+const CHART_MARGIN = { top: 10, right: 20, left: 0, bottom: 30 };
+const TOOLTIP_CURSOR = { stroke: "#ccc", strokeWidth: 1 };
+const TICK_STYLE = { fontSize: 12, fill: "#666" };
+const CANVAS_POINT_THRESHOLD = ${canvas_point_threshold};
+const ANIMATION_POINT_THRESHOLD = ${animation_point_threshold};
+const SERIES_KEYS = ["series1", "series2"] as const;
+const SERIES_COLORS = ["#061551", "#0e68b3"];
+
+// Dense series are painted onto one <canvas> so DOM size stays constant.
+const CanvasSeriesChart = ({ data, type }: { data: ChartPoint[]; type: "bar" | "area" }) => {
+  const canvasRef = React.useRef<HTMLCanvasElement>(null);
+
+  React.useEffect(() => {
+    const canvas = canvasRef.current;
+    const ctx = canvas?.getContext("2d");
+    if (!canvas || !ctx) return;
+
+    const { width, height } = canvas.getBoundingClientRect();
+    const dpr = window.devicePixelRatio || 1;
+    canvas.width = width * dpr;
+    canvas.height = height * dpr;
+    ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+    ctx.clearRect(0, 0, width, height);
+
+    // Bars sit side by side; areas are stacked like the recharts version.
+    const tops = SERIES_KEYS.map((_, s) =>
+      data.map((d) => (type === "area" ? SERIES_KEYS.slice(0, s + 1).reduce((sum, k) => sum + d[k], 0) : d[SERIES_KEYS[s]]))
+    );
+    let min = 0;
+    let max = 0;
+    tops.forEach((row) => row.forEach((v) => { min = Math.min(min, v); max = Math.max(max, v); }));
+    const range = max - min || 1;
+    const y = (v: number) => height - ((v - min) / range) * height;
+    const step = width / data.length;
+
+    SERIES_KEYS.forEach((_, s) => {
+      ctx.fillStyle = SERIES_COLORS[s];
+      if (type === "bar") {
+        const barWidth = Math.max(1, step / SERIES_KEYS.length - 1);
+        tops[s].forEach((v, i) => {
+          ctx.fillRect(i * step + s * barWidth, y(Math.max(v, 0)), barWidth, Math.abs(y(v) - y(0)));
+        });
+        return;
+      }
+      const base = s === 0 ? data.map(() => 0) : tops[s - 1];
+      ctx.globalAlpha = 0.8;
+      ctx.beginPath();
+      tops[s].forEach((v, i) => ctx.lineTo(i * step + step / 2, y(v)));
+      for (let i = data.length - 1; i >= 0; i--) ctx.lineTo(i * step + step / 2, y(base[i]));
+      ctx.closePath();
+      ctx.fill();
+      ctx.globalAlpha = 1;
+    });
+  }, [data, type]);
+
+  return <canvas ref={canvasRef} className="h-full w-full" />;
+};
+
+const sameSeries = (a: ChartPoint[], b: ChartPoint[]) =>
+  a.length === b.length && a.every((p, i) => p.name === b[i].name && p.series1 === b[i].series1 && p.series2 === b[i].series2);
+
+// Static SVG built in Python; only the tooltip layer runs in the browser.
+const StaticSvgChart = ({ svg, data }: { svg: string; data: ChartPoint[] }) => {
+  const [active, setActive] = React.useState<{ index: number; x: number; y: number } | null>(null);
+
+  const onMouseMove = (event: React.MouseEvent<HTMLDivElement>) => {
+    const el = event.currentTarget.querySelector("svg");
+    const ctm = el?.getScreenCTM();
+    if (!el || !ctm) return;
+    const point = new DOMPoint(event.clientX, event.clientY).matrixTransform(ctm.inverse());
+    const index = Math.floor((point.x - Number(el.dataset.left)) / Number(el.dataset.step));
+    const box = event.currentTarget.getBoundingClientRect();
+    setActive(index >= 0 && index < data.length ? { index, x: event.clientX - box.left, y: event.clientY - box.top } : null);
+  };
+
+  const point = active && data[active.index];
+  return (
+    <div className="relative h-full w-full" onMouseMove={onMouseMove} onMouseLeave={() => setActive(null)}>
+      <div className="h-full w-full" dangerouslySetInnerHTML={{ __html: svg }} />
+      {active && point && (
+        <div className="pointer-events-none absolute rounded border bg-white px-2 py-1 text-xs shadow" style={{ left: active.x + 12, top: active.y + 12 }}>
+          <div className="font-medium text-gray-900">{point.name}</div>
+          {SERIES_KEYS.map((key, s) => (
+            <div key={key} style={{ color: SERIES_COLORS[s] }}>
+              {chartConfig[key].label}: {point[key].toLocaleString()}
+            </div>
+          ))}
+        </div>
+      )}
+    </div>
+  );
+};
+
+// Parses rawFinancialText on a worker thread; its results override the defaults.
+const useParsedFinancialText = (rawText?: string) => {
+  const [parsed, setParsed] = React.useState<Partial<SchemaType>>({});
+
+  React.useEffect(() => {
+    if (!rawText) return;
+    const worker = new Worker(new URL("./financialParser.worker.ts", import.meta.url));
+    worker.onmessage = (event: MessageEvent<Partial<SchemaType>>) => setParsed(event.data);
+    worker.postMessage(rawText);
+    return () => worker.terminate();
+  }, [rawText]);
+
+  return parsed;
+};
+
+const STATIC_CHARTS = {
+  bar: { svg: STATIC_BAR_SVG, data: DEFAULT_BAR_DATA },
+  area: { svg: STATIC_AREA_SVG, data: DEFAULT_AREA_DATA },
+};
+
+// Both charts share one memoized panel, so hovering one does not re-render the other.
+const ChartPanel = React.memo(({ type, data }: { type: "bar" | "area"; data: ChartPoint[] }) => {
+  const prerendered = STATIC_CHARTS[type];
+  if (prerendered.svg && sameSeries(data, prerendered.data)) {
+    return <StaticSvgChart svg={prerendered.svg} data={data} />;
+  }
+  if (data.length > CANVAS_POINT_THRESHOLD) {
+    return <CanvasSeriesChart data={data} type={type} />;
+  }
+
+  const Chart = type === "bar" ? BarChart : AreaChart;
+  const animate = data.length <= ANIMATION_POINT_THRESHOLD;
+  return (
+    <ChartContainer config={chartConfig} className="h-full w-full">
+      <Chart data={data} margin={CHART_MARGIN} barCategoryGap="20%">
+        <CartesianGrid strokeDasharray="3 3" stroke="#f0f0f0" />
+        <XAxis dataKey="name" axisLine={false} tickLine={false} tick={TICK_STYLE} />
+        <YAxis axisLine={false} tickLine={false} tick={TICK_STYLE} />
+        <ChartTooltip isAnimationActive={false} cursor={TOOLTIP_CURSOR} content={<ChartTooltipContent />} />
+        {SERIES_KEYS.map((key, s) =>
+          type === "bar" ? (
+            <Bar key={key} dataKey={key} fill={SERIES_COLORS[s]} radius={[2, 2, 0, 0]} barSize={15} isAnimationActive={animate} />
+          ) : (
+            <Area key={key} type="monotone" dataKey={key} stackId="1" stroke={SERIES_COLORS[s]} fill={SERIES_COLORS[s]} fillOpacity={0.8} isAnimationActive={animate} />
+          )
+        )}
+      </Chart>
+    </ChartContainer>
+  );
+});
+
+const FinancialComparisonSlide = ({ data }: { data: Partial<SchemaType> }) => {
+  const parsed = useParsedFinancialText(data.rawFinancialText);
+  const { sectionTitle, organizationName, brandLogo, barChartData, areaChartData, leftChartTitle, leftChartDescription, rightChartTitle, rightChartDescription } = { ...data, ...parsed };
+  const bars = React.useMemo(() => barChartData ?? [], [barChartData]);
+  const areas = React.useMemo(() => areaChartData ?? [], [areaChartData]);
+
+  return (
+    <div className="aspect-video max-w-[1280px] w-full bg-white relative overflow-hidden">
+      <div className="h-20 bg-teal-600 px-16 py-4 flex justify-between items-center">
+        {sectionTitle && <h1 className="text-4xl font-black text-white">{sectionTitle}</h1>}
+        <div className="flex items-center space-x-3">
+          {brandLogo?.__image_url__ && <div className="w-8 h-8"><img src={brandLogo.__image_url__} alt={brandLogo.__image_prompt__} className="w-full h-full object-contain" /></div>}
+          {organizationName && <span className="text-lg font-bold text-white">{organizationName}</span>}
+        </div>
+      </div>
+
+      <div className="flex-1 h-[calc(100%-80px)] flex">
+        <div className="w-1/2 p-8 bg-gray-50 flex flex-col">
+          <div className="flex items-center justify-start mb-4 space-x-4">
+            <div className="flex items-center space-x-2">
+              <div className="w-3 h-3 bg-teal-600 rounded-full"></div>
+              <span className="text-sm text-gray-600">{chartConfig.series1.label}</span>
+            </div>
+            <div className="flex items-center space-x-2">
+              <div className="w-3 h-3 bg-green-400 rounded-full"></div>
+              <span className="text-sm text-gray-600">{chartConfig.series2.label}</span>
+            </div>
+          </div>
+
+          {bars.length > 0 && (
+            <div className="flex-1 mb-6">
+              <ChartPanel type="bar" data={bars} />
+            </div>
+          )}
+
+          <div className="space-y-3">
+            {leftChartTitle && <h3 className="text-xl font-bold text-gray-900">{leftChartTitle}</h3>}
+            {leftChartDescription && <p className="text-base leading-relaxed text-gray-700">{leftChartDescription}</p>}
+          </div>
+        </div>
+
+        <div className="w-1/2 p-8 bg-white flex flex-col">
+          <div className="flex items-center justify-end mb-4 space-x-4">
+            <div className="flex items-center space-x-2">
+              <div className="w-3 h-3 bg-teal-600 rounded-full"></div>
+              <span className="text-sm text-gray-600">Trend</span>
+            </div>
+          </div>
+
+          {areas.length > 0 && (
+            <div className="flex-1 mb-6">
+              <ChartPanel type="area" data={areas} />
+            </div>
+          )}
+
+          <div className="space-y-3">
+            {rightChartTitle && <h3 className="text-xl font-bold text-gray-900">{rightChartTitle}</h3>}
+            {rightChartDescription && <p className="text-base leading-relaxed text-gray-700">{rightChartDescription}</p>}
+          </div>
+        </div>
+      </div>
+    </div>
+  );
+};
+
+export default React.memo(FinancialComparisonSlide);
+''')
+
+# Worker used by the comparison slide to re-derive its chart data from raw
+# report text without blocking the main thread.
+_FINANCIAL_PARSER_WORKER_TS = '''type ChartPoint = { name: string; series1: number; series2: number; series3: number };
+
+const MONTHS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"];
+const HEADING_RE = /^[A-Za-z][A-Za-z &]{1,40}$/;
+// "Sep 2024 ($5,097) vs Aug 2024 ($9,374)" / "Sep 2024 recorded $5,200, while Aug 2024 was $9,384"
+const PAIR_RE = /\\b([A-Z][a-z]{2,8})\\s+(\\d{4})\\b[^$\\d-]{0,20}(-?\\$?-?[\\d,]+(?:\\.\\d+)?)/g;
+
+const periodKey = (month: string, year: string) => Number(year) * 12 + MONTHS.indexOf(month.slice(0, 3).toLowerCase());
+const toNumber = (raw: string) => Number(raw.replace(/[$,]/g, ""));
+
+self.onmessage = (event: MessageEvent<string>) => {
+  const barChartData: ChartPoint[] = [];
+  let period1 = "";
+  let period2 = "";
+  let metric = "";
+
+  for (const rawLine of event.data.split("\\n")) {
+    const line = rawLine.trim();
+    if (HEADING_RE.test(line)) {
+      metric = line;
+      continue;
+    }
+    if (!metric || !/period-over-period/i.test(line)) continue;
+
+    const pairs = [...line.matchAll(PAIR_RE)]
+      .filter((m) => MONTHS.includes(m[1].slice(0, 3).toLowerCase()))
+      .slice(0, 2)
+      .map((m) => ({ label: `${m[1].slice(0, 3)} ${m[2]}`, key: periodKey(m[1], m[2]), value: toNumber(m[3]) }))
+      .sort((a, b) => a.key - b.key);
+    if (pairs.length < 2) continue;
+
+    [period1, period2] = [pairs[0].label, pairs[1].label];
+    barChartData.push({
+      name: metric,
+      series1: pairs[0].value,
+      series2: pairs[1].value,
+      series3: pairs[1].value - pairs[0].value,
+    });
+  }
+
+  if (!barChartData.length) {
+    self.postMessage({});
+    return;
+  }
+
+  let running1 = 0;
+  let running2 = 0;
+  const areaChartData = barChartData.map((p) => {
+    running1 += p.series1;
+    running2 += p.series2;
+    return { name: p.name, series1: running1, series2: running2, series3: running2 - running1 };
+  });
+
+  self.postMessage({ barChartData, areaChartData, leftChartTitle: `${period1} vs ${period2}` });
+};
+'''
+
+
+def _write_tsx(file_path: Path, tsx_content: str) -> bool:
+    """
+    Write generated source as UTF-8 in a single unbuffered write.
+
+    When the file on disk already holds exactly these bytes the write is
+    skipped, so its mtime is unchanged and bundler watchers do not rebuild
+    for unchanged output. A size check rules out most changed files without
+    reading them.
+
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    data = tsx_content.encode("utf-8")
+    try:
+        if file_path.stat().st_size == len(data) and file_path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+
+    with open(file_path, "wb", buffering=0) as f:
+        f.write(data)
+    return True
+
+
+_T = TypeVar("_T")
+
+
+def _run_sync(coro: Coroutine[Any, Any, _T]) -> _T:
+    """
+    Run a coroutine to completion for a synchronous wrapper.
+
+    asyncio.run refuses to start inside a running event loop (a FastAPI
+    handler, a notebook), so there the coroutine gets its own loop on a
+    worker thread; the caller blocks until it finishes either way.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+# Completions persisted across runs, so re-processing the same upload skips
+# the 20-30s preprocessing call after a restart
+_LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", ".cache/llm")
+_LLM_CACHE_TTL = 7 * 24 * 3600
+
+# Output cap for slide data extracted from prefiltered text (one-pass path;
+# unfiltered text keeps MAX_TOKENS). A full report is about 10 KPIs of ~120
+# tokens (name, value, label, kpis, bullets) plus up to ~8 recent chart
+# points of ~18 tokens each after prefiltering, ~2,600 tokens in all; the
+# suggested 1,500 would truncate typical reports, 3,000 leaves headroom
+_SLIDE_DATA_MAX_TOKENS = 3000
+
+
+@lru_cache(maxsize=None)
+def _persistent_llm_cache():
+    """Open the on-disk completion cache, or None when diskcache is not installed."""
+    if diskcache is None:
+        return None
+    return diskcache.Cache(_LLM_CACHE_DIR, size_limit=1 << 30)
+
+
+# A complete string literal, or a brace outside one
+_JSON_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[{}]')
+
+
+def _first_json_object(text: str) -> str:
+    """
+    Return the first balanced {...} object in an AI response.
+
+    Scans forward from the first "{" counting braces outside string
+    literals, so markdown fences and prose before or after the JSON (even
+    prose containing "}") are dropped in one pass. An object that never
+    closes is returned to the end of the text for json_repair to finish.
+    """
+    start = text.find("{")
+    if start == -1:
+        return text
+    depth = 0
+    for match in _JSON_TOKEN_RE.finditer(text, start):
+        token = match.group()
+        if token == "{":
+            depth += 1
+        elif token == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:match.end()]
+    return text[start:]
+
+
+def _loads_json(text: str) -> Any:
+    """Parse a JSON document, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+class _MetricStreamScanner:
+    """
+    Pick completed items of the top-level "metrics" array out of streamed JSON.
+
+    String/escape state and bracket nesting are tracked across chunks, so each
+    metric object is returned as soon as its closing brace arrives rather than
+    after the whole response has been received. Top-level string fields such
+    as title, subtitle and date are collected in `header` as they complete.
+    """
+
+    def __init__(self):
+        self._reset()
+        # True once the root object has closed; later text is trailing noise
+        self.done = False
+
+    def _reset(self) -> None:
+        """Forget the object scanned so far and wait for the next root "{"."""
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._root_chars: Optional[List[str]] = None
+        self._root_key: Optional[str] = None
+        self._after_colon = False
+        self._in_metrics = False
+        self._saw_metrics = False
+        self._item: Optional[List[str]] = None
+        self.header: Dict[str, str] = {}
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume the next piece of text and return metrics completed by it."""
+        completed = []
+        for ch in chunk:
+            if not self._stack and (self.done or ch != "{"):
+                # Prose around the JSON (brackets included) is not part of it
+                continue
+            if self._item is not None:
+                self._item.append(ch)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._root_chars is not None:
+                        self._end_root_string("".join(self._root_chars))
+                        self._root_chars = None
+                    continue
+                if self._root_chars is not None:
+                    self._root_chars.append(ch)
+                continue
+
+            if len(self._stack) == 1 and ch in ":,{[":
+                self._after_colon = ch == ":"
+            if ch == '"':
+                self._in_string = True
+                if len(self._stack) == 1:
+                    self._root_chars = []
+            elif ch in "{[":
+                if ch == "{" and self._in_metrics and len(self._stack) == 2 and self._item is None:
+                    self._item = [ch]
+                elif ch == "[" and len(self._stack) == 1 and self._root_key == "metrics":
+                    self._in_metrics = self._saw_metrics = True
+                self._stack.append(ch)
+            elif ch in "}]" and self._stack:
+                self._stack.pop()
+                if ch == "}" and self._item is not None and len(self._stack) == 2:
+                    try:
+                        completed.append(_loads_json("".join(self._item)))
+                    except ValueError:
+                        pass  # left to the full-document parse and repair
+                    self._item = None
+                elif ch == "]" and len(self._stack) == 1:
+                    self._in_metrics = False
+                if not self._stack:
+                    if self._saw_metrics:
+                        self.done = True
+                        break
+                    # Braces in a preamble such as "Here is {the data}:"
+                    self._reset()
+        return completed
+
+    @property
+    def truncated(self) -> bool:
+        """True if the text so far stops inside an unclosed JSON object."""
+        return bool(self._stack)
+
+    def _end_root_string(self, raw: str) -> None:
+        """Record a completed top-level string as the current key or its value."""
+        try:
+            value = json.loads(f'"{raw}"')
+        except ValueError:
+            return
+        if self._after_colon:
+            self.header[self._root_key] = value
+            self._after_colon = False
+        else:
+            # The last root-level key before "[" is that array's key
+            self._root_key = value
+
+
+def _dumps_json(value: Any) -> str:
+    """Serialize slide data to a compact JSON literal for embedding in TSX."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY).decode("utf-8")
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+_MONTHS = {
+    name: number
+    for number, names in enumerate(
+        [("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"),
+         ("may",), ("jun", "june"), ("jul", "july"), ("aug", "august"),
+         ("sep", "sept", "september"), ("oct", "october"), ("nov", "november"), ("dec", "december")],
+        start=1,
+    )
+    for name in names
+}
+# "Jan 2021" / "January 2021", "01/2021", "2021-01"
+_DATE_RE = re.compile(r"([A-Za-z]+)\s+(\d{4})|(\d{1,2})/(\d{4})|(\d{4})-(\d{1,2})")
+# Unparseable labels sort after every real period
+_UNKNOWN_DATE = datetime(9999, 12, 31)
+
+
+@lru_cache(maxsize=1024)
+def _parse_period(date_str: str) -> datetime:
+    """Parse a chart period label to the first day of its month."""
+    match = _DATE_RE.fullmatch(date_str.strip())
+    if not match:
+        return _UNKNOWN_DATE
+    name, year, month_num, year_num, iso_year, iso_month = match.groups()
+    if name:
+        month = _MONTHS.get(name.lower(), 0)
+    elif month_num:
+        month, year = int(month_num), year_num
+    else:
+        month, year = int(iso_month), iso_year
+    if not 1 <= month <= 12:
+        return _UNKNOWN_DATE
+    return datetime(int(year), month, 1)
+
+
+_YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+
+
+_MONTH_NAME_RE = re.compile(r"\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)", re.IGNORECASE)
+_QUARTER_RE = re.compile(r"\b(?:q[1-4]|quarter)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def _detect_comparison_type(prev_label: str, latest_label: str) -> str:
+    """
+    Label a KPI comparison as YoY, QoQ, MoM or plain "vs Previous".
+
+    The same label pairs recur across every metric of a report, so results
+    are cached.
+    """
+    if not prev_label or not latest_label:
+        return "vs Previous"
+
+    prev = prev_label.lower()
+    latest = latest_label.lower()
+    prev_year = _YEAR_RE.search(prev)
+    latest_year = _YEAR_RE.search(latest)
+
+    # Year-over-Year detection: different years, same period within
+    # the year (Sep 2023 → Sep 2024, Q3 2023 → Q3 2024, 2023 → 2024)
+    if prev_year and latest_year and prev_year.group() != latest_year.group():
+        if _YEAR_RE.sub("", prev).strip() == _YEAR_RE.sub("", latest).strip():
+            return f"YoY ({prev_label} → {latest_label})"
+
+    # Quarter-over-Quarter detection
+    if _QUARTER_RE.search(prev) and _QUARTER_RE.search(latest):
+        return f"QoQ ({prev_label} → {latest_label})"
+
+    # Month-over-Month detection, including across a year boundary
+    # (e.g., Dec 2020 → Jan 2021)
+    if _MONTH_NAME_RE.search(prev) and _MONTH_NAME_RE.search(latest):
+        return f"MoM ({prev_label} → {latest_label})"
+
+    # Default fallback
+    return f"vs Previous ({prev_label} → {latest_label})"
+
+
+_QUARTER_PERIOD_RE = re.compile(r"\bQ[1-4]\s+(\d{4})\b", re.IGNORECASE)
+
+
+def _period_years(line: str) -> List[int]:
+    """
+    Years of the month and quarter periods in a line ("Sep 2024", "09/2024",
+    "2024-09", "Q3 2024"), capped at the current year.
+
+    Bare four-digit numbers are not periods: "2090 units" is a quantity.
+    """
+    years = []
+    for match in _DATE_RE.finditer(line):
+        name, year, month_num, year_num, iso_year, iso_month = match.groups()
+        if name:
+            month = _MONTHS.get(name.lower(), 0)
+        elif month_num:
+            month, year = int(month_num), year_num
+        else:
+            month, year = int(iso_month), iso_year
+        if 1 <= month <= 12:
+            years.append(int(year))
+    years += [int(year) for year in _QUARTER_PERIOD_RE.findall(line)]
+    this_year = datetime.now().year
+    return [min(year, this_year) for year in years]
+
+
+def _prefilter_recent_periods(text: str) -> str:
+    """
+    Drop lines whose every period predates the recent comparison window.
+
+    The preprocessing prompt asks the model to discard historical periods;
+    removing lines with nothing recent in them up front means those tokens
+    are never sent. "Recent" is the latest period year in the text and the
+    one before it. Lines without a period (headings, reasons) and lines
+    mixing old and recent periods are kept. If that would drop most of the
+    text, the period detection is not trusted and the text is sent as is.
+    """
+    lines = text.splitlines()
+    line_years = [_period_years(line) for line in lines]
+    years = [year for found in line_years for year in found]
+    if not years:
+        return text
+    cutoff = max(years) - 1
+
+    kept = [line for line, found in zip(lines, line_years) if not found or max(found) >= cutoff]
+    if len(kept) * 2 < len(lines):
+        return text
+    return "\n".join(kept)
+
+
+# Lowercase keywords for the 10 KPIs, by extraction category
+_KPI_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "revenue": ("revenue", "income", "sales", "gross", "cost of sale", "cogs"),
+    "profitability": ("ebitda", "net income", "profit", "margin", "expense", "opex"),
+    "operational": ("cash", "collection", "payment", "inventory", "days", "receivable", "payable", "liquidity"),
+}
+_ALL_KPI_KEYWORDS = tuple(keyword for keywords in _KPI_KEYWORDS.values() for keyword in keywords)
+_PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n")
+
+
+def _prefilter_kpi_paragraphs(text: str) -> str:
+    """
+    Drop blank-line separated paragraphs that mention none of the 10 KPIs.
+
+    The first paragraph is always kept as context (report header, company,
+    period). Text without paragraph breaks comes back unchanged.
+    """
+    paragraphs = _PARAGRAPH_SPLIT_RE.split(text)
+    if len(paragraphs) < 2:
+        return text
+    kept = [paragraphs[0]] + [
+        paragraph for paragraph in paragraphs[1:]
+        if any(keyword in paragraph.lower() for keyword in _ALL_KPI_KEYWORDS)
+    ]
+    return "\n\n".join(kept)
+
+
+def _prefilter_for_extraction(text: str) -> str:
+    """Trim raw report text to recent periods and KPI-related paragraphs."""
+    return _prefilter_kpi_paragraphs(_prefilter_recent_periods(text))
+
+
+def _point_value(point: Dict, key: str) -> float:
+    try:
+        return float(point.get(key) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+@dataclass
+class FinancialSeries:
+    """
+    Chart points stored column-wise (one array per field) instead of as a
+    list of dicts, so domains and downsampling run as vectorized numpy ops.
+    Dicts are only rebuilt by `to_points` when the data is serialized.
+    """
+    names: np.ndarray
+    series1: np.ndarray
+    series2: np.ndarray
+    series3: np.ndarray
+
+    @classmethod
+    def from_points(cls, points: List[Dict]) -> "FinancialSeries":
+        """Build the columns from `{name, series1, series2, series3}` dicts."""
+        def column(key: str) -> np.ndarray:
+            return np.array([_point_value(p, key) for p in points], dtype=np.float64)
+
+        return cls(
+            names=np.array([str(p.get("name", "")) for p in points], dtype=object),
+            series1=column("series1"),
+            series2=column("series2"),
+            series3=column("series3"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def take(self, indices: np.ndarray) -> "FinancialSeries":
+        """Return the points at `indices`, in that order."""
+        return FinancialSeries(
+            self.names[indices], self.series1[indices], self.series2[indices], self.series3[indices]
+        )
+
+    def is_chronological(self) -> bool:
+        """True if every name is a period label and they are in time order."""
+        periods = [_parse_period(name) for name in self.names.tolist()]
+        return _UNKNOWN_DATE not in periods and periods == sorted(periods)
+
+    def downsample(self, n_out: int) -> "FinancialSeries":
+        """
+        Reduce a time series to at most `n_out` points with LTTB on series1.
+
+        LTTB assumes an ordered x axis, so categorical series (named items
+        rather than periods) are returned whole: dropping one would silently
+        remove a real category.
+        """
+        if len(self) <= n_out or not self.is_chronological():
+            return self
+        return self.take(_lttb(self.series1, n_out))
+
+    def to_points(self) -> List[Dict]:
+        """Zip the columns back into dicts, keeping whole numbers as ints."""
+        def plain(values: np.ndarray) -> List:
+            return [int(v) if v.is_integer() else v for v in values.tolist()]
+
+        return [
+            {"name": name, "series1": s1, "series2": s2, "series3": s3}
+            for name, s1, s2, s3 in zip(
+                self.names.tolist(), plain(self.series1), plain(self.series2), plain(self.series3)
+            )
+        ]
+
+
+def _lttb(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Select indices to keep with Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last point and, for every bucket in between, the point
+    forming the largest triangle with the previously kept point and the average
+    of the next bucket, which preserves peaks and troughs of `y`.
+    """
+    n = len(y)
+    if n_out < 3 or n <= n_out:
+        return np.arange(n)
+
+    bucket_size = (n - 2) / (n_out - 2)
+    keep = [0]
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        avg_x = (end + next_end - 1) / 2
+        avg_y = y[end:next_end].mean()
+
+        candidates = np.arange(start, end)
+        area = np.abs((a - avg_x) * (y[start:end] - y[a]) - (a - candidates) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        keep.append(a)
+    keep.append(n - 1)
+    return np.array(keep)
+
+
+# Geometry of the prerendered comparison charts, in SVG user units. Margins
+# mirror CHART_MARGIN in the template plus room for the y-axis labels.
+_SVG_WIDTH = 560
+_SVG_HEIGHT = 320
+_SVG_MARGIN = {"top": 10, "right": 20, "bottom": 30, "left": 60}
+_SVG_SERIES = (("series1", "#061551"), ("series2", "#0e68b3"))
+
+
+def _nice_ticks(lo: float, hi: float, count: int = 5) -> List[float]:
+    """Round tick values covering [lo, hi], like the recharts default axis."""
+    if hi <= lo:
+        hi = lo + 1
+    raw_step = (hi - lo) / (count - 1)
+    magnitude = 10 ** math.floor(math.log10(raw_step))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw_step)
+    first = math.floor(lo / step)
+    last = math.ceil(hi / step)
+    return [i * step for i in range(first, last + 1)]
+
+
+def _format_tick(value: float) -> str:
+    """Format an axis tick as a plain number with thousands separators."""
+    if float(value).is_integer():
+        return f"{value:,.0f}"
+    return f"{value:,.6f}".rstrip("0").rstrip(".")
+
+
+def _svg_frame(names: np.ndarray, lo: float, hi: float):
+    """
+    Build the shared grid, axis labels and scales for a prerendered chart.
+
+    Returns:
+        (svg parts, band width, y scale function)
+    """
+    m = _SVG_MARGIN
+    plot_w = _SVG_WIDTH - m["left"] - m["right"]
+    plot_h = _SVG_HEIGHT - m["top"] - m["bottom"]
+    ticks = _nice_ticks(lo, hi)
+    lo, hi = ticks[0], ticks[-1]
+    step = plot_w / max(len(names), 1)
+
+    def y(value: float) -> float:
+        return m["top"] + plot_h - (value - lo) / (hi - lo) * plot_h
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {_SVG_WIDTH} {_SVG_HEIGHT}" '
+        f'width="100%" height="100%" font-size="12" data-left="{m["left"]}" data-step="{step:.3f}">'
+    ]
+    for tick in ticks:
+        ty = y(tick)
+        parts.append(
+            f'<line x1="{m["left"]}" x2="{m["left"] + plot_w}" y1="{ty:.1f}" y2="{ty:.1f}" '
+            f'stroke="#f0f0f0" stroke-dasharray="3 3"/>'
+        )
+        parts.append(
+            f'<text x="{m["left"] - 8}" y="{ty:.1f}" fill="#666" text-anchor="end" '
+            f'dominant-baseline="middle">{_format_tick(tick)}</text>'
+        )
+    for i, name in enumerate(names):
+        cx = m["left"] + step * (i + 0.5)
+        parts.append(
+            f'<text x="{cx:.1f}" y="{_SVG_HEIGHT - m["bottom"] + 18}" fill="#666" '
+            f'text-anchor="middle">{html.escape(name)}</text>'
+        )
+    return parts, step, y
+
+
+def _render_bar_svg(series: FinancialSeries) -> str:
+    """Render grouped bars for series1/series2 as static SVG markup."""
+    columns = [getattr(series, key) for key, _ in _SVG_SERIES]
+    lo = min(0.0, *(float(c.min()) for c in columns))
+    hi = max(0.0, *(float(c.max()) for c in columns))
+    parts, step, y = _svg_frame(series.names, lo, hi)
+    # barSize 15 with a 20% category gap, narrowed when the band is too tight.
+    bar_w = min(15.0, step * 0.8 / len(_SVG_SERIES))
+    x0 = _SVG_MARGIN["left"] + step * (np.arange(len(series)) + 0.5) - bar_w * len(_SVG_SERIES) / 2
+    for i in range(len(series)):
+        for s, (column, (_, color)) in enumerate(zip(columns, _SVG_SERIES)):
+            value = float(column[i])
+            top = y(max(value, 0))
+            height = abs(y(value) - y(0))
+            parts.append(
+                f'<rect x="{x0[i] + s * bar_w:.1f}" y="{top:.1f}" width="{bar_w:.1f}" '
+                f'height="{height:.1f}" fill="{color}"/>'
+            )
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def _render_area_svg(series: FinancialSeries) -> str:
+    """Render series1/series2 as stacked filled areas in static SVG markup."""
+    tops = np.cumsum([getattr(series, key) for key, _ in _SVG_SERIES], axis=0)
+    bottoms = np.vstack([np.zeros(len(series)), tops[:-1]])
+    parts, step, y = _svg_frame(series.names, min(0.0, float(tops.min())), max(0.0, float(tops.max())))
+    xs = _SVG_MARGIN["left"] + step * (np.arange(len(series)) + 0.5)
+    for bottom, top, (_, color) in zip(bottoms, tops, _SVG_SERIES):
+        outline = [f"{x:.1f},{y(v):.1f}" for x, v in zip(xs, top)]
+        outline += [f"{x:.1f},{y(v):.1f}" for x, v in zip(xs[::-1], bottom[::-1])]
+        parts.append(
+            f'<path d="M{" L".join(outline)} Z" fill="{color}" fill-opacity="0.8" stroke="{color}"/>'
+        )
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+# ── System prompts ───────────────────────────────────────────────────────────
+# Kept as module constants so every request starts with a byte-identical
+# prefix; OpenAI and DeepSeek both cache repeated prompt prefixes server-side,
+# so only the per-report user message is billed and prefilled at full cost.
+
+# Shared by the preprocessing prompt and the one-pass extraction prompt
+_DATE_FILTERING_RULES = """CRITICAL DATE FILTERING RULES:
+- Focus ONLY on period-over-period analysis (recent consecutive months/periods)
+- Include the main comparison periods (e.g., Aug 2024 vs Sep 2024)
+- Include 1-2 surrounding periods for context (e.g., July, Oct, Nov 2024)
+- EXCLUDE historical data from years before the main comparison periods
+- EXCLUDE data from 2019, 2020, 2021, 2022, 2023 unless it's directly relevant to recent trends
+- Prioritize data from 2024 and the most recent periods"""
+
+_PREPROCESS_SYSTEM_PROMPT = """You are a financial text preprocessor. Your job is to clean, structure, and organize raw financial text to make it easier to extract specific KPIs.
+
+ONLY extract and structure data for these 10 KPIs:
+1. Income (Revenue/Sales)
+2. Cost of Sale (COGS/Cost of Goods Sold)
+3. Expenses (Operating Expenses)
+4. Gross Profit
+5. EBITDA
+6. Net Income
+7. Cash Flow
+8. Customer Collection Days
+9. Supplier Payment Days
+10. Inventory Days
+
+""" + _DATE_FILTERING_RULES + """
+
+For each KPI found in the text:
+- Extract the KPI name, values, and time periods (RECENT PERIODS ONLY)
+- Show increase/decrease between consecutive recent periods
+- Organize chronologically (most recent periods)
+- Standardize names (e.g., "Revenue" → "Income", "COGS" → "Cost of Sale")
+- Make numerical values and dates clear
+- Include any explanations or context mentioned for recent periods
+
+Example: If comparing Aug 2024 vs Sep 2024, include July 2024, Aug 2024, Sep 2024, Oct 2024, Nov 2024 data but EXCLUDE May 2019, Dec 2020, etc.
+
+Ignore all other metrics not in the above list and ignore historical data beyond recent periods. Return only the cleaned, structured data for these 10 KPIs focusing on recent period-over-period analysis."""
+
+# JSON shape for slide data, shared by the slides and one-pass prompts
+_SLIDE_DATA_FORMAT = """Return ONLY valid JSON with this structure:
+{
+    "title": "Financial Analysis Report",
+    "subtitle": "Period Range",
+    "date": "Current Date",
+    "metrics": [
+        {
+            "name": "Income",
+            "value": "$155,815",
+            "label": "Peak Revenue (Dec 2020)",
+            "kpis": {
+                "vs_previous": {"pct": -44.6, "from": 9384, "to": 5200},
+                "previous_label": "Aug 2024",
+                "latest_label": "Sep 2024"
+            },
+            "bullet_points": [
+                "Key insight with specific numbers and trends",
+                "Another insight with root causes if mentioned"
+            ],
+            "chart_data": [
+                {"name": "May 2019", "series1": 8321, "series2": 0, "series3": 0}
+            ]
+        }
+    ],
+}"""
+
+# Extraction rules shared by the slide system prompts
+_SLIDE_EXTRACTION_INSTRUCTIONS = """INSTRUCTIONS:
+1. Extract all metrics: Income, Gross Profit, EBITDA, Cost of Sales, Collection Days, Payment Days, Inventory Days, Operating Expenses
+2. For each metric, get all values with time periods
+3. Sort chart_data chronologically (oldest to newest)
+4. Include root causes and explanations from the text
+
+EXAMPLE: "Income $88,912 in Feb 2021 vs $84,629 in Jan 2021"
+- chart_data: [
+    {"name": "Jan 2021", "series1": 84629, "series2": 0, "series3": 0},
+    {"name": "Feb 2021", "series1": 88912, "series2": 0, "series3": 0}
+  ]
+
+Each metric needs:
+1. "name": Metric name
+2. "value": Latest/most significant value with $
+3. "label": Descriptive label
+4. "chart_data": All data points sorted chronologically
+5. "kpis": Percentage changes with vs_previous and yoy
+6. "bullet_points": 2-3 key insights with numbers, trends, and any root causes mentioned
+
+Return valid JSON with all metrics and data points."""
+
+_SLIDES_SYSTEM_PROMPT = """You are a financial data analyst. Parse financial text and extract structured data for TSX slides.
+
+Extract metrics: Income, Revenue, Gross Profit, EBITDA, Net Income, Cost of Sales, Operating Expenses, Collection Days, Payment Days, Inventory Days.
+
+""" + _SLIDE_DATA_FORMAT + """
+
+""" + _SLIDE_EXTRACTION_INSTRUCTIONS
+
+_ONEPASS_SYSTEM_PROMPT = """You are a financial data analyst. Read raw, unstructured financial text and extract structured data for TSX slides in a single pass, without a separate cleanup step.
+
+Extract metrics: Income, Revenue, Gross Profit, EBITDA, Net Income, Cost of Sales, Operating Expenses, Cash Flow, Collection Days, Payment Days, Inventory Days.
+Standardize names (e.g., "Revenue" → "Income", "COGS" → "Cost of Sale").
+
+""" + _DATE_FILTERING_RULES + """
+
+""" + _SLIDE_DATA_FORMAT + """
+
+""" + _SLIDE_EXTRACTION_INSTRUCTIONS
+
+
+_ALL_METRICS_SYSTEM_PROMPT = """You are a financial data analyst. Extract ALL of these metrics from the preprocessed financial text, grouped by category:
+
+revenue:
+1. Income (Revenue/Sales)
+2. Gross Profit
+3. Cost of Sale (COGS/Cost of Goods Sold)
+
+profitability:
+4. EBITDA
+5. Net Income
+6. Expenses (Operating Expenses)
+
+operational:
+7. Cash Flow
+8. Customer Collection Days
+9. Supplier Payment Days
+10. Inventory Days
+
+Return ONLY valid JSON with this structure:
+{
+    "metrics": [
+        {
+            "category": "revenue",
+            "name": "Income",
+            "value": "$155,815",
+            "label": "Peak Revenue (Dec 2020)",
+            "kpis": {
+                "vs_previous": {"pct": -44.6, "from": 9384, "to": 5200},
+                "previous_label": "Aug 2024",
+                "latest_label": "Sep 2024"
+            },
+            "bullet_points": [
+                "Key insight with specific numbers and trends",
+                "Another insight with root causes if mentioned"
+            ],
+            "chart_data": [
+                {"name": "May 2019", "series1": 8321, "series2": 0, "series3": 0}
+            ]
+        }
+    ]
+}
+
+CRITICAL for Cash Flow metric:
+- series1 = Operating Activities (cash from operations)
+- series2 = Investing Activities (cash from investments, usually negative)
+- series3 = Financing Activities (cash from financing, can be positive or negative)
+- Extract ALL three components for EACH period if mentioned in the text
+- If a component is not mentioned for a period, use 0
+
+For every other metric use series1 for the value and 0 for series2 and series3."""
 
 
 class FinancialTSXGenerator:
     """Generates TSX slide components for financial data."""
-    
+
+    # Series longer than this are drawn on a single <canvas> instead of one
+    # SVG node per point in the generated comparison slide.
+    CANVAS_POINT_THRESHOLD = 50
+    # Recharts tween animations are skipped for series longer than this;
+    # kept below CANVAS_POINT_THRESHOLD so dense SVG charts mount unanimated.
+    ANIMATION_POINT_THRESHOLD = 20
+    # Reports stacked into one prompt by process_financial_batch_async; more
+    # than this per call and models start dropping or merging reports.
+    BATCH_SIZE = 10
+
+    # Compiled slide templates keyed by slide kind; parsed once at import and
+    # shared by every generator instance and worker thread.
+    TEMPLATES: Dict[str, Template] = {
+        "title": _TITLE_SLIDE_TSX,
+        "statistic": _STATISTIC_SLIDE_TSX,
+        "comparison": _COMPARISON_SLIDE_TSX,
+    }
+
     def __init__(self):
         """Initialize the TSX generator."""
-        self.ai_service = AIService()
+        self.ai_service = get_ai_service()
+        # Completions keyed by SHA-256 of (model, messages); see _cached_completion
+        self._llm_cache: Dict[str, str] = {}
+        # Requests in flight under the same key, shared by concurrent callers
+        self._llm_pending: Dict[str, "asyncio.Future[str]"] = {}
+        # Read once per report and shared by every date string it produces
+        self._report_timestamp: Optional[datetime] = None
+        # Set while write_slide_files is writing into a zip; see _write_slide
+        self._archive: Optional[zipfile.ZipFile] = None
+        self._archive_lock = threading.Lock()
+
+    def _report_time(self) -> datetime:
+        """Timestamp of the report being processed, taken on first use."""
+        if self._report_timestamp is None:
+            self._report_timestamp = datetime.now()
+        return self._report_timestamp
+
+    async def _cached_completion(
+        self,
+        messages: List[Dict[str, str]],
+        on_chunk: Optional[Callable[[str], Optional[bool]]] = None,
+        response_model: Optional[Type[BaseModel]] = None,
+        force_refresh: bool = False,
+        model: Optional[str] = None,
+        store: bool = True,
+        max_tokens: Optional[int] = None
+    ) -> str:
+        """
+        Call the AI service, reusing the response for identical requests.
+
+        Re-running the same report text (dev loops, retries) returns the
+        earlier completion instead of paying for another API round trip.
+        Responses are also persisted on disk for a week when diskcache is
+        installed, so the reuse survives process restarts. Requests run at
+        temperature 0 so a cached response is the one a fresh call would give.
+        Messages that differ only in whitespace share a cache entry; any
+        other change to the text, however small, is a miss.
+
+        Args:
+            messages: Chat messages passed to generate_completion
+            on_chunk: If given, the response is streamed and each fragment is
+                passed to it as it arrives (a cached or shared response
+                arrives whole); returning True stops reading the stream, e.g.
+                once the JSON document is complete
+            response_model: Pydantic model to request structured output for
+            force_refresh: Skip cached responses and call the AI service (the
+                new response replaces the cached one)
+            model: Model to use instead of the service's configured one
+            store: Cache a new response as soon as it arrives. Callers that
+                parse the response pass False, then call _store_response once
+                it has validated (or _evict_response if it did not), so broken
+                or truncated output is never replayed from the cache
+            max_tokens: Output token cap instead of the configured MAX_TOKENS
+        Returns:
+            Generated text response
+        """
+        key = self._completion_cache_key(messages, response_model, model)
+        cached = None if force_refresh else self._cached_response(key)
+        if cached is not None:
+            print(f"♻️  Reusing cached AI response ({key[:12]})")
+            if on_chunk:
+                on_chunk(cached)
+            return cached
+
+        if key in self._llm_pending:
+            response = await asyncio.shield(self._llm_pending[key])
+            if on_chunk:
+                on_chunk(response)
+            return response
+
+        async def fetch() -> str:
+            if not on_chunk:
+                return await self.ai_service.generate_completion_async(
+                    messages, temperature=0, max_tokens=max_tokens,
+                    response_model=response_model, model=model
+                )
+            chunks = []
+            stream = self.ai_service.stream_completion_async(
+                messages, temperature=0, max_tokens=max_tokens,
+                response_model=response_model, model=model
+            )
+            try:
+                async for chunk in stream:
+                    chunks.append(chunk)
+                    if on_chunk(chunk):
+                        break
+            finally:
+                await stream.aclose()
+            return "".join(chunks)
+
+        pending = asyncio.ensure_future(fetch())
+        self._llm_pending[key] = pending
+        try:
+            response = await asyncio.shield(pending)
+        finally:
+            self._llm_pending.pop(key, None)
+        if store:
+            self._store_response(key, response)
+        return response
+
+    def _completion_cache_key(
+        self,
+        messages: List[Dict[str, str]],
+        response_model: Optional[Type[BaseModel]] = None,
+        model: Optional[str] = None
+    ) -> str:
+        """Cache key for a completion request, see _cached_completion."""
+        # Whitespace is collapsed for the key only, so a report re-exported
+        # with different line wrapping or spacing still hits the cache
+        key_messages = [{**m, "content": " ".join(m["content"].split())} for m in messages]
+        key_parts: List[Any] = [model or self.ai_service.model, key_messages]
+        if response_model is not None:
+            key_parts.append(response_model.__name__)
+        return hashlib.sha256(json.dumps(key_parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _cached_response(self, key: str) -> Optional[str]:
+        """Look a completion up in memory, then on disk."""
+        cached = self._llm_cache.get(key)
+        disk_cache = _persistent_llm_cache()
+        if cached is None and disk_cache is not None:
+            cached = disk_cache.get(key)
+            if cached is not None:
+                self._llm_cache[key] = cached
+        return cached
+
+    def _store_response(self, key: str, response: str) -> None:
+        """Remember a completion in memory and, if available, on disk."""
+        self._llm_cache[key] = response
+        disk_cache = _persistent_llm_cache()
+        if disk_cache is not None:
+            disk_cache.set(key, response, expire=_LLM_CACHE_TTL)
+
+    def _evict_response(self, key: str) -> None:
+        """Forget a cached completion that turned out to be unusable."""
+        self._llm_cache.pop(key, None)
+        disk_cache = _persistent_llm_cache()
+        if disk_cache is not None:
+            disk_cache.delete(key)
     
+    def clear_cache(self) -> None:
+        """Forget cached AI responses, in memory and on disk."""
+        self._llm_cache.clear()
+        disk_cache = _persistent_llm_cache()
+        if disk_cache is not None:
+            disk_cache.clear()
+
     def _parse_date(self, date_str: str) -> datetime:
-        """Parse date string to datetime for sorting."""
-        try:
-            # Try various date formats
-            formats = [
-                "%b %Y",      # "Jan 2021", "Dec 2020"
-                "%B %Y",      # "January 2021", "December 2020"
-                "%m/%Y",      # "01/2021"
-                "%Y-%m",      # "2021-01"
-            ]
-            for fmt in formats:
-                try:
-                    return datetime.strptime(date_str, fmt)
-                except ValueError:
-                    continue
-            # If no format matches, return a far future date so it goes to the end
-            return datetime(9999, 12, 31)
-        except:
-            return datetime(9999, 12, 31)
+        """Parse date string to datetime for sorting."""
+        return _parse_period(date_str) if isinstance(date_str, str) else _UNKNOWN_DATE
     
-    def _sort_chart_data_chronologically(self, chart_data: List[Dict]) -> List[Dict]:
-        """Sort chart data by date chronologically."""
+    def _sort_metric_chart_data(self, metric: Dict[str, Any]) -> None:
+        """Sort one metric's chart_data chronologically in place."""
+        if 'chart_data' in metric and metric['chart_data']:
+            metric['chart_data'], was_resorted = self._sort_chart_data_chronologically(metric['chart_data'])
+            if was_resorted:
+                logger.debug("Sorted %s data chronologically", metric.get('name'))
+
+    def _sort_chart_data_chronologically(self, chart_data: List[Dict]) -> Tuple[List[Dict], bool]:
+        """
+        Sort chart data by date chronologically.
+
+        Returns:
+            (sorted chart data, whether the order changed). Data the model
+            already returned in order is passed back as-is without sorting.
+        """
         if not chart_data:
-            return chart_data
+            return chart_data, False
         
-        # Sort by parsing the 'name' field as a date
-        try:
-            sorted_data = sorted(chart_data, key=lambda x: self._parse_date(x.get('name', '')))
-            return sorted_data
-        except Exception as e:
-            print(f"   ⚠️  Could not sort dates: {e}")
-            return chart_data
+        # Parse each 'name' once up front; _parse_date never raises, so the
+        # only failure left is a malformed (non-dict) point from the model
+        if not all(isinstance(point, dict) for point in chart_data):
+            print(f"   ⚠️  Could not sort dates: chart_data contains non-object points")
+            return chart_data, False
+        keys = [self._parse_date(point.get('name', '')) for point in chart_data]
+        if all(keys[i] <= keys[i + 1] for i in range(len(keys) - 1)):
+            return chart_data, False
+        order = sorted(range(len(chart_data)), key=keys.__getitem__)
+        return [chart_data[i] for i in order], True
     
     async def preprocess_with_deepseek_async(self, raw_financial_text: str) -> str:
         """
@@ -66,61 +1595,31 @@ class FinancialTSXGenerator:
         Returns:
             Cleaned and structured financial text ready for metric extraction
         """
-        preprocessing_prompt = """You are a financial text preprocessor. Your job is to clean, structure, and organize raw financial text to make it easier to extract specific KPIs.
-
-ONLY extract and structure data for these 10 KPIs:
-1. Income (Revenue/Sales)
-2. Cost of Sale (COGS/Cost of Goods Sold)
-3. Expenses (Operating Expenses)
-4. Gross Profit
-5. EBITDA
-6. Net Income
-7. Cash Flow
-8. Customer Collection Days
-9. Supplier Payment Days
-10. Inventory Days
-
-CRITICAL DATE FILTERING RULES:
-- Focus ONLY on period-over-period analysis (recent consecutive months/periods)
-- Include the main comparison periods (e.g., Aug 2024 vs Sep 2024)
-- Include 1-2 surrounding periods for context (e.g., July, Oct, Nov 2024)
-- EXCLUDE historical data from years before the main comparison periods
-- EXCLUDE data from 2019, 2020, 2021, 2022, 2023 unless it's directly relevant to recent trends
-- Prioritize data from 2024 and the most recent periods
-
-For each KPI found in the text:
-- Extract the KPI name, values, and time periods (RECENT PERIODS ONLY)
-- Show increase/decrease between consecutive recent periods
-- Organize chronologically (most recent periods)
-- Standardize names (e.g., "Revenue" → "Income", "COGS" → "Cost of Sale")
-- Make numerical values and dates clear
-- Include any explanations or context mentioned for recent periods
-
-Example: If comparing Aug 2024 vs Sep 2024, include July 2024, Aug 2024, Sep 2024, Oct 2024, Nov 2024 data but EXCLUDE May 2019, Dec 2020, etc.
-
-Ignore all other metrics not in the above list and ignore historical data beyond recent periods. Return only the cleaned, structured data for these 10 KPIs focusing on recent period-over-period analysis."""
+        filtered_text = _prefilter_for_extraction(raw_financial_text)
+        print(f"✂️  Prefiltered historical and non-KPI text: {len(raw_financial_text)} → {len(filtered_text)} chars")
 
         user_prompt = f"""Clean and structure this raw financial text:
 
-{raw_financial_text}
+{filtered_text}
 
 Return the cleaned, well-organized version that preserves all financial data but makes it easier to extract metrics from."""
 
         messages = [
-            {"role": "system", "content": preprocessing_prompt},
+            {"role": "system", "content": _PREPROCESS_SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt}
         ]
         
         try:
             import time
             preprocess_start = time.time()
-            response = self.ai_service.generate_completion(messages)
+            response = await self._cached_completion(messages)
             preprocess_duration = time.time() - preprocess_start
             
             print(f"🧠 DeepSeek preprocessing completed in {preprocess_duration:.2f}s")
             print(f"📝 Original text length: {len(raw_financial_text)} chars")
             print(f"📝 Preprocessed text length: {len(response)} chars")
-            print(f"🔍 Preprocessed text preview: {response}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Preprocessed text: %s", response)
             
             return response
             
@@ -131,81 +1630,21 @@ Return the cleaned, well-organized version that preserves all financial data but
 
     def preprocess_with_deepseek(self, raw_financial_text: str) -> str:
         """
-        First stage: Use DeepSeek to preprocess and clean the raw financial text.
-        This makes the text more structured and easier to parse in the second stage.
+        Synchronous wrapper around preprocess_with_deepseek_async.
         
         Args:
             raw_financial_text: Raw, unstructured financial text
         Returns:
             Cleaned and structured financial text ready for metric extraction
         """
-        preprocessing_prompt = """You are a financial text preprocessor. Your job is to clean, structure, and organize raw financial text to make it easier to extract specific KPIs.
-
-ONLY extract and structure data for these 10 KPIs:
-1. Income (Revenue/Sales)
-2. Cost of Sale (COGS/Cost of Goods Sold)
-3. Expenses (Operating Expenses)
-4. Gross Profit
-5. EBITDA
-6. Net Income
-7. Cash Flow
-8. Customer Collection Days
-9. Supplier Payment Days
-10. Inventory Days
-
-CRITICAL DATE FILTERING RULES:
-- Focus ONLY on period-over-period analysis (recent consecutive months/periods)
-- Include the main comparison periods (e.g., Aug 2024 vs Sep 2024)
-- Include 1-2 surrounding periods for context (e.g., July, Oct, Nov 2024)
-- EXCLUDE historical data from years before the main comparison periods
-- EXCLUDE data from 2019, 2020, 2021, 2022, 2023 unless it's directly relevant to recent trends
-- Prioritize data from 2024 and the most recent periods
-
-For each KPI found in the text:
-- Extract the KPI name, values, and time periods (RECENT PERIODS ONLY)
-- Show increase/decrease between consecutive recent periods
-- Organize chronologically (most recent periods)
-- Standardize names (e.g., "Revenue" → "Income", "COGS" → "Cost of Sale")
-- Make numerical values and dates clear
-- Include any explanations or context mentioned for recent periods
-
-Example: If comparing Aug 2024 vs Sep 2024, include July 2024, Aug 2024, Sep 2024, Oct 2024, Nov 2024 data but EXCLUDE May 2019, Dec 2020, etc.
-
-Ignore all other metrics not in the above list and ignore historical data beyond recent periods. Return only the cleaned, structured data for these 10 KPIs focusing on recent period-over-period analysis."""
-
-        user_prompt = f"""Clean and structure this raw financial text:
-
-{raw_financial_text}
-
-Return the cleaned, well-organized version that preserves all financial data but makes it easier to extract metrics from."""
-
-        messages = [
-            {"role": "system", "content": preprocessing_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
-        
-        try:
-            import time
-            preprocess_start = time.time()
-            response = self.ai_service.generate_completion(messages)
-            preprocess_duration = time.time() - preprocess_start
-            
-            print(f"🧠 DeepSeek preprocessing completed in {preprocess_duration:.2f}s")
-            print(f"📝 Original text length: {len(raw_financial_text)} chars")
-            print(f"📝 Preprocessed text length: {len(response)} chars")
-            print(f"🔍 Preprocessed text preview: {response}")
-            
-            return response
-            
-        except Exception as e:
-            print(f"❌ DeepSeek preprocessing failed: {str(e)}")
-            print("🔄 Falling back to original text...")
-            return raw_financial_text
+        return _run_sync(self.preprocess_with_deepseek_async(raw_financial_text))
 
     async def generate_financial_slides_async(
         self,
         financial_text: str,
-        output_dir: str = "generated_slides"
+        output_dir: str = "generated_slides",
+        force_refresh: bool = False,
+        write_title_early: bool = False
     ) -> Dict[str, Any]:
         """
         Async version: Generate TSX slide components from financial text.
@@ -213,376 +1652,412 @@ Return the cleaned, well-organized version that preserves all financial data but
         Args:
             financial_text: Raw financial analysis text
             output_dir: Directory to save generated slides
+            force_refresh: Ignore a cached AI response for this text
+            write_title_early: Write the title slide to output_dir as soon as
+                the streamed response has its title, subtitle and date,
+                instead of leaving every file to write_slide_files
         Returns:
             Parsed financial data in JSON format
         """
-        system_prompt = """You are a financial data analyst. Parse financial text and extract structured data for TSX slides.
-
-Extract metrics: Income, Revenue, Gross Profit, EBITDA, Net Income, Cost of Sales, Operating Expenses, Collection Days, Payment Days, Inventory Days.
+        # Each call is a new report; its dates are read on first use
+        self._report_timestamp = None
+        messages = self._slide_messages(financial_text)
+        if not write_title_early:
+            return await self._complete_slide_data(messages, financial_text, force_refresh)
+
+        title_write: Optional[asyncio.Future] = None
+
+        def on_header(header: Dict[str, str]) -> None:
+            nonlocal title_write
+            output_path = Path(output_dir)
+            output_path.mkdir(parents=True, exist_ok=True)
+            title_write = asyncio.get_running_loop().run_in_executor(
+                None, self._generate_title_slide, header, output_path
+            )
 
-Return ONLY valid JSON with this structure:
-{
-    "title": "Financial Analysis Report",
-    "subtitle": "Period Range",
-    "date": "Current Date",
-    "metrics": [
-        {
-            "name": "Income",
-            "value": "$155,815",
-            "label": "Peak Revenue (Dec 2020)",
-            "kpis": {
-                "vs_previous": {"pct": -44.6, "from": 9384, "to": 5200},
-                "previous_label": "Aug 2024",
-                "latest_label": "Sep 2024"
-            },
-            "bullet_points": [
-                "Key insight with specific numbers and trends",
-                "Another insight with root causes if mentioned"
-            ],
-            "chart_data": [
-                {"name": "May 2019", "series1": 8321, "series2": 0, "series3": 0}
-            ]
-        }
-    ],
-}"""
+        data = await self._complete_slide_data(messages, financial_text, force_refresh, on_header)
+        if title_write is not None:
+            await title_write
+        return data
 
+    @staticmethod
+    def _slide_messages(financial_text: str) -> List[Dict[str, str]]:
+        """Chat messages asking for slide data from preprocessed financial text."""
         user_prompt = f"""Parse this financial text and extract all metrics with their values and dates:
 
-{financial_text}
+{financial_text}"""
 
-INSTRUCTIONS:
-1. Extract all metrics: Income, Gross Profit, EBITDA, Cost of Sales, Collection Days, Payment Days, Inventory Days, Operating Expenses
-2. For each metric, get all values with time periods
-3. Sort chart_data chronologically (oldest to newest)
-4. Include root causes and explanations from the text
+        return [
+            {"role": "system", "content": _SLIDES_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
 
-EXAMPLE: "Income $88,912 in Feb 2021 vs $84,629 in Jan 2021"
-- chart_data: [
-    {{"name": "Jan 2021", "series1": 84629, "series2": 0, "series3": 0}},
-    {{"name": "Feb 2021", "series1": 88912, "series2": 0, "series3": 0}}
-  ]
+    async def extract_financial_data_onepass_async(self, raw_financial_text: str) -> Dict[str, Any]:
+        """
+        Extract slide data straight from raw text in a single AI call.
 
-Each metric needs:
-1. "name": Metric name
-2. "value": Latest/most significant value with $
-3. "label": Descriptive label
-4. "chart_data": All data points sorted chronologically
-5. "kpis": Percentage changes with vs_previous and yoy
-6. "bullet_points": 2-3 key insights with numbers, trends, and any root causes mentioned
+        Combines the preprocessing rules (recent-period filtering, name
+        standardisation) with the slide extraction schema, so the report
+        costs one round trip instead of preprocessing followed by extraction.
 
-Return valid JSON with all metrics and data points."""
+        Args:
+            raw_financial_text: Raw, unstructured financial text
+        Returns:
+            Parsed financial data in JSON format
+        """
+        filtered_text = _prefilter_for_extraction(raw_financial_text)
+        print(f"✂️  Prefiltered historical and non-KPI text: {len(raw_financial_text)} → {len(filtered_text)} chars")
+
+        user_prompt = f"""Parse this raw financial text and extract all metrics with their values and dates:
+
+{filtered_text}"""
 
         messages = [
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": _ONEPASS_SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt}
         ]
+        max_tokens = min(self.ai_service.max_tokens or _SLIDE_DATA_MAX_TOKENS, _SLIDE_DATA_MAX_TOKENS)
+        return await self._complete_slide_data(messages, raw_financial_text, max_tokens=max_tokens)
+
+    async def _complete_slide_data(
+        self,
+        messages: List[Dict[str, str]],
+        financial_text: str,
+        force_refresh: bool = False,
+        on_header: Optional[Callable[[Dict[str, str]], None]] = None,
+        max_tokens: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Request slide data for `messages` and parse, repair and sort it.
+
+        The request goes to the service's extraction model, which may be a
+        smaller, cheaper model than the main one (EXTRACTION_MODEL); if that
+        yields no metrics, it is repeated once with the main model.
+        `on_header`, if given, is called once with the title, subtitle and date
+        as soon as the streamed response contains all three. `max_tokens`
+        caps the response instead of the configured MAX_TOKENS; a response
+        cut off by it counts as a failure rather than being repaired.
+        """
+        extraction_model = self.ai_service.extraction_model
+        data = await self._request_slide_data(
+            messages, financial_text, force_refresh, on_header, extraction_model, max_tokens
+        )
+        if not data.get("metrics") and extraction_model != self.ai_service.model:
+            print(f"🔁 No metrics from {extraction_model}, retrying with {self.ai_service.model}")
+            data = await self._request_slide_data(
+                messages, financial_text, force_refresh, max_tokens=max_tokens
+            )
+        return data
+
+    async def _request_slide_data(
+        self,
+        messages: List[Dict[str, str]],
+        financial_text: str,
+        force_refresh: bool = False,
+        on_header: Optional[Callable[[Dict[str, str]], None]] = None,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """One slide-data request and parse for _complete_slide_data."""
+        # Metrics are sorted as soon as the stream closes each one, overlapping
+        # that work with the rest of the response
+        scanner = _MetricStreamScanner()
+        streamed_metrics: List[Dict[str, Any]] = []
+
+        def on_chunk(text: str) -> bool:
+            nonlocal on_header
+            metrics = scanner.feed(text)
+            if on_header and {"title", "subtitle", "date"} <= scanner.header.keys():
+                on_header({key: scanner.header[key] for key in ("title", "subtitle", "date")})
+                on_header = None
+            for metric in metrics:
+                try:
+                    # Same normalisation as the full ReportData parse below
+                    metric = Metric.model_validate(metric).model_dump(by_alias=True, exclude_none=True)
+                except ValidationError:
+                    pass
+                self._sort_metric_chart_data(metric)
+                streamed_metrics.append(metric)
+            return scanner.done
         
+        key = self._completion_cache_key(messages, ReportData, model)
         try:
             import time
             ai_start = time.time()
-            response = self.ai_service.generate_completion(messages)
+            response = await self._cached_completion(
+                messages, on_chunk=on_chunk, response_model=ReportData,
+                force_refresh=force_refresh, model=model, store=False,
+                max_tokens=max_tokens
+            )
             ai_duration = time.time() - ai_start
             
-            # Debug: Print raw response to diagnose parsing issues
-            print(f"\n🤖 Raw AI Response (All): {response}")
+            # Debug: Log raw response to diagnose parsing issues
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Raw AI Response (All): %s", response)
             print(f"⚡ AI Response received in {ai_duration:.2f}s")
+            if scanner.truncated:
+                # Repair would close the JSON and silently drop the metrics
+                # that did not fit
+                raise ValueError("response was cut off at the output token limit")
             
-            # Clean the response - sometimes AI adds extra text
-            response = response.strip()
-            if response.startswith('```json'):
-                response = response[7:]
-            if response.endswith('```'):
-                response = response[:-3]
-            response = response.strip()
-            
-            # Try to find JSON in the response
-            json_start = response.find('{')
-            json_end = response.rfind('}') + 1
-            if json_start != -1 and json_end > json_start:
-                response = response[json_start:json_end]
-            
-            # Enhanced JSON parsing with error recovery
             try:
-                parsed_data = json.loads(response)
-            except json.JSONDecodeError as json_error:
-                print(f"🔧 JSON parsing failed, attempting to fix common issues...")
-                print(f"   Error: {json_error}")
-                
-                # Common fixes for malformed JSON
-                fixed_response = response
-                
-                # Fix trailing commas
-                import re
-                fixed_response = re.sub(r',(\s*[}\]])', r'\1', fixed_response)
-                
-                # Fix missing commas between objects
-                fixed_response = re.sub(r'}\s*{', '},{', fixed_response)
-                
-                # Fix unescaped quotes in strings
-                fixed_response = re.sub(r'(?<!\\)"(?=[^,}\]]*[,}\]])', r'\\"', fixed_response)
-                
-                # Try parsing again
+                # Structured output (OpenAI json_schema) is guaranteed to match
+                # ReportData, so this skips the cleanup and repair below
+                parsed_data = ReportData.model_validate_json(response).model_dump(
+                    by_alias=True, exclude_none=True
+                )
+                self._store_response(key, response)
+            except ValidationError:
+                # Providers limited to plain JSON mode can still wrap the JSON
+                # in extra text or break it - cut it out and repair. Only
+                # valid responses are cached, so a rerun asks the AI again
+                self._evict_response(key)
+                response = _first_json_object(response)
+            
+                # Enhanced JSON parsing with error recovery
                 try:
-                    parsed_data = json.loads(fixed_response)
+                    parsed_data = _loads_json(response)
+                except json.JSONDecodeError as json_error:
+                    print(f"🔧 JSON parsing failed, attempting to repair...")
+                    print(f"   Error: {json_error}")
+                
+                    # json_repair handles trailing/missing commas and unescaped
+                    # quotes inside strings without touching valid JSON
+                    parsed_data = repair_json(response, return_objects=True)
+                    if not isinstance(parsed_data, dict):
+                        print(f"❌ JSON still invalid after repair")
+                        print(f"🔍 Problematic JSON (first 500 chars): {response[:500]}...")
+                        raise json_error  # Raise original error
                     print(f"✅ JSON fixed and parsed successfully!")
-                except json.JSONDecodeError as second_error:
-                    print(f"❌ JSON still invalid after fixes: {second_error}")
-                    print(f"🔍 Problematic JSON (first 500 chars): {fixed_response[:500]}...")
-                    raise json_error  # Raise original error
             
-            # Sort chart_data chronologically for each metric
-            for metric in parsed_data.get('metrics', []):
-                if 'chart_data' in metric and metric['chart_data']:
-                    original_data = metric['chart_data'].copy()
-                    metric['chart_data'] = self._sort_chart_data_chronologically(metric['chart_data'])
-                    
-                    # Check if sorting changed the order
-                    if original_data != metric['chart_data']:
-                        print(f"   📅 Sorted {metric.get('name')} data chronologically")
+            # Reuse the metrics already sorted during streaming when they match
+            # the full parse; otherwise (e.g. after repair) sort them now
+            metrics = parsed_data.get('metrics', [])
+            if [m.get('name') for m in streamed_metrics] == [m.get('name') for m in metrics if isinstance(m, dict)]:
+                parsed_data['metrics'] = streamed_metrics
+            else:
+                for metric in metrics:
+                    self._sort_metric_chart_data(metric)
             
-            # Debug: Print what AI extracted
+            # Summarise what AI extracted; per-point detail only at DEBUG
             print(f"\n🤖 AI Extracted Data:")
             print(f"   Metrics count: {len(parsed_data.get('metrics', []))}")
+            debug = logger.isEnabledFor(logging.DEBUG)
             for metric in parsed_data.get('metrics', []):  # Show ALL metrics
                 chart_data = metric.get('chart_data', [])
-                print(f"   - {metric.get('name')}: {len(chart_data)} data points")
-                if chart_data:
-                    for i, point in enumerate(chart_data[:3]):  # Show first 3 points
-                        print(f"     [{i+1}] {point.get('name')}: ${point.get('series1', 0):,}")
-                else:
-                    print(f"     ⚠️  NO CHART DATA EXTRACTED!")
+                if not chart_data:
+                    print(f"   - {metric.get('name')}: ⚠️  NO CHART DATA EXTRACTED!")
+                elif debug:
+                    logger.debug(
+                        "%s: %d data points, first 3: %s",
+                        metric.get('name'), len(chart_data), chart_data[:3]
+                    )
             
             return parsed_data
         except json.JSONDecodeError as e:
             print(f"⚠️  JSON parsing error: {e}")
             print(f"⚠️  Problematic response: {response[:500]}...")
+            self._evict_response(key)
             return self._create_default_structure(financial_text)
         except Exception as e:
             print(f"⚠️  Error generating data: {e}")
-            print(f"⚠️  Response received: {response if 'response' in locals() else 'No response received'}")
+            self._evict_response(key)
+            if 'response' in locals():
+                print(f"⚠️  Response received: {response[:500]}...")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Full response: %s", response)
+            else:
+                print(f"⚠️  No response received")
             return self._create_default_structure(financial_text)
 
     async def process_financial_data_concurrently(
         self,
         raw_financial_text: str,
-        output_dir: str = "generated_slides"
+        output_dir: str = "generated_slides",
+        one_pass: bool = True
     ) -> Dict[str, Any]:
         """
-        Process financial data using concurrent AI operations for improved performance.
-        
-        This method runs preprocessing and data extraction concurrently when possible,
-        reducing the total processing time from ~68s to potentially ~35-40s.
+        Process financial data, by default with a single AI round trip.
+
+        The one-pass call filters and extracts in one prompt. If it is
+        disabled, or returns no metrics (e.g. a model with too short a
+        context for the combined prompt), the two-step path runs instead:
+        preprocessing, then extraction on the preprocessed text.
         
         Args:
             raw_financial_text: Raw financial text input
             output_dir: Directory to save generated slides
+            one_pass: Try the single-call extraction first
         Returns:
             Parsed financial data in JSON format
         """
         import time
         concurrent_start = time.time()
+        self._report_timestamp = datetime.now()
         
-        print(f"🚀 Starting concurrent AI processing...")
-        
-        # Strategy: Run preprocessing first, then use the result for data extraction
-        # We can't truly parallelize these since data extraction depends on preprocessing
-        # But we can optimize the workflow and prepare for future parallel operations
+        print(f"🚀 Starting AI processing...")
         
-        # Step 1: Preprocessing (must complete first)
-        print(f"🧠 Step 1: DeepSeek preprocessing...")
-        preprocessed_text = await self.preprocess_with_deepseek_async(raw_financial_text)
+        parsed_data: Dict[str, Any] = {}
+        if one_pass:
+            print(f"📊 One-pass extraction...")
+            parsed_data = await self.extract_financial_data_onepass_async(raw_financial_text)
         
-        # Step 2: Data extraction using preprocessed text
-        print(f"📊 Step 2: AI data extraction...")
-        parsed_data = await self.generate_financial_slides_async(preprocessed_text, output_dir)
+        if not parsed_data.get("metrics"):
+            if one_pass:
+                print(f"🔄 One-pass extraction returned no metrics, falling back to two steps...")
+            # Step 1: Preprocessing (must complete first)
+            print(f"🧠 Step 1: DeepSeek preprocessing...")
+            preprocessed_text = await self.preprocess_with_deepseek_async(raw_financial_text)
+            
+            # Step 2: Data extraction using preprocessed text
+            print(f"📊 Step 2: AI data extraction...")
+            parsed_data = await self.generate_financial_slides_async(preprocessed_text, output_dir)
         
         concurrent_duration = time.time() - concurrent_start
-        print(f"⚡ Total concurrent processing completed in {concurrent_duration:.2f}s")
+        print(f"⚡ Total processing completed in {concurrent_duration:.2f}s")
         
         return parsed_data
 
-    def extract_revenue_metrics_sync(self, preprocessed_text: str) -> Dict[str, Any]:
-        """Extract revenue-related metrics synchronously for ThreadPoolExecutor"""
-        system_prompt = """You are a financial data analyst specializing in REVENUE METRICS. Extract ONLY these metrics from the preprocessed financial text:
-
-1. Income (Revenue/Sales)
-2. Gross Profit
-3. Cost of Sale (COGS/Cost of Goods Sold)
-
-Return ONLY valid JSON with this structure:
-{
-    "metrics": [
-        {
-            "name": "Income",
-            "value": "$155,815",
-            "label": "Peak Revenue (Dec 2020)",
-            "kpis": {
-                "vs_previous": {"pct": -44.6, "from": 9384, "to": 5200},
-                "previous_label": "Aug 2024",
-                "latest_label": "Sep 2024"
-            },
-            "bullet_points": [
-                "Key insight with specific numbers and trends",
-                "Another insight with root causes if mentioned"
-            ],
-            "chart_data": [
-                {"name": "May 2019", "series1": 8321, "series2": 0, "series3": 0}
-            ]
-        }
-    ]
-}"""
+    async def extract_all_metrics_async(self, preprocessed_text: str) -> Dict[str, Any]:
+        """
+        Extract all 10 KPIs in one completion instead of one call per group.
 
-        user_prompt = f"""Extract ONLY revenue-related metrics (Income, Gross Profit, Cost of Sale) from this preprocessed text:
+        Each metric carries a "category" of revenue, profitability or
+        operational so the result can still be grouped like the three
+        separate extractions.
+        """
+        user_prompt = f"""Extract all 10 metrics from this preprocessed text:
 
 {preprocessed_text}
 
 Focus on:
-- All revenue/income values with time periods
-- Gross profit calculations and trends
-- Cost of goods sold data
+- Every value with its time period
+- Set "category" to revenue, profitability or operational as listed
 - Sort chart_data chronologically
-- Include percentage changes and insights"""
+- Include percentage changes and insights
+- Omit metrics that are not mentioned in the text"""
 
         messages = [
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": _ALL_METRICS_SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt}
         ]
-        
-        try:
-            thread_id = threading.get_ident()
-            print(f"🔵 Revenue extraction starting on thread {thread_id}")
-            response = self.ai_service.generate_completion(messages)
-            print(f"🔵 Revenue extraction completed on thread {thread_id}")
-            return self._parse_json_response(response, "Revenue Metrics")
-        except Exception as e:
-            print(f"❌ Revenue metrics extraction failed: {str(e)}")
-            return {"metrics": []}
-
-    def extract_profitability_metrics_sync(self, preprocessed_text: str) -> Dict[str, Any]:
-        """Extract profitability-related metrics synchronously for ThreadPoolExecutor"""
-        system_prompt = """You are a financial data analyst specializing in PROFITABILITY METRICS. Extract ONLY these metrics from the preprocessed financial text:
-
-1. EBITDA
-2. Net Income
-3. Expenses (Operating Expenses)
-
-Return ONLY valid JSON with this structure:
-{
-    "metrics": [
-        {
-            "name": "EBITDA",
-            "value": "$45,200",
-            "label": "Strong EBITDA (Q3 2024)",
-            "kpis": {
-                "vs_previous": {"pct": 15.2, "from": 39200, "to": 45200},
-                "previous_label": "Q2 2024",
-                "latest_label": "Q3 2024"
-            },
-            "bullet_points": [
-                "Key insight with specific numbers and trends",
-                "Another insight with root causes if mentioned"
-            ],
-            "chart_data": [
-                {"name": "Q1 2024", "series1": 35000, "series2": 0, "series3": 0}
-            ]
-        }
-    ]
-}"""
 
-        user_prompt = f"""Extract ONLY profitability metrics (EBITDA, Net Income, Operating Expenses) from this preprocessed text:
+        # Streamed so reading stops as soon as the JSON object closes
+        scanner = _MetricStreamScanner()
 
-{preprocessed_text}
-
-Focus on:
-- EBITDA values and calculations
-- Net income trends over time
-- Operating expense breakdowns
-- Sort chart_data chronologically
-- Include percentage changes and insights"""
+        def on_chunk(text: str) -> bool:
+            scanner.feed(text)
+            return scanner.done
 
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
-        
+        key = self._completion_cache_key(messages, MetricsExtraction)
         try:
-            thread_id = threading.get_ident()
-            print(f"🟡 Profitability extraction starting on thread {thread_id}")
-            response = self.ai_service.generate_completion(messages)
-            print(f"🟡 Profitability extraction completed on thread {thread_id}")
-            return self._parse_json_response(response, "Profitability Metrics")
-        except Exception as e:
-            print(f"❌ Profitability metrics extraction failed: {str(e)}")
-            return {"metrics": []}
-
-    def extract_operational_metrics_sync(self, preprocessed_text: str) -> Dict[str, Any]:
-        """Extract operational efficiency metrics synchronously for ThreadPoolExecutor"""
-        system_prompt = """You are a financial data analyst specializing in OPERATIONAL METRICS. Extract ONLY these metrics from the preprocessed financial text:
-
-1. Cash Flow
-2. Customer Collection Days
-3. Supplier Payment Days
-4. Inventory Days
-
-Return ONLY valid JSON with this structure:
-{
-    "metrics": [
-        {
-            "name": "Cash Flow",
-            "value": "$125,000",
-            "label": "Net Cash Flow",
-            "kpis": {
-                "vs_previous": {"pct": -12.5, "from": 142857, "to": 125000},
-                "previous_label": "Previous Month",
-                "latest_label": "Current Month"
-            },
-            "bullet_points": [
-                "Key insight with specific numbers and trends",
-                "Another insight with root causes if mentioned"
-            ],
-            "chart_data": [
-                {"name": "Jan 2024", "series1": 150000, "series2": -50000, "series3": -30000},
-                {"name": "Feb 2024", "series1": 180000, "series2": -60000, "series3": -40000}
-            ]
-        }
-    ]
-}
+            response = await self._cached_completion(
+                messages, on_chunk=on_chunk, response_model=MetricsExtraction, store=False
+            )
+            try:
+                result = MetricsExtraction.model_validate_json(response).model_dump(
+                    by_alias=True, exclude_none=True
+                )
+                self._store_response(key, response)
+                return result
+            except ValidationError:
+                self._evict_response(key)
+                return self._parse_json_response(response, "All Metrics")
+        except Exception as e:
+            print(f"❌ Combined metrics extraction failed: {str(e)}")
+            self._evict_response(key)
+            return {"metrics": []}
 
-CRITICAL for Cash Flow metric:
-- series1 = Operating Activities (cash from operations)
-- series2 = Investing Activities (cash from investments, usually negative)
-- series3 = Financing Activities (cash from financing, can be positive or negative)
-- Extract ALL three components for EACH period if mentioned in the text
-- If a component is not mentioned for a period, use 0
-- Sort chart_data chronologically"""
+    @staticmethod
+    def _group_metrics_by_category(result: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Split an extract_all_metrics_async result into revenue, profitability
+        and operational results, in the shape of the old per-group calls.
+        """
+        # Metrics without a recognised category are kept with the operational group
+        groups: Dict[str, List[Dict[str, Any]]] = {"revenue": [], "profitability": [], "operational": []}
+        for metric in result.get("metrics", []):
+            groups.get(metric.get("category"), groups["operational"]).append(metric)
+        return {category: {"metrics": metrics} for category, metrics in groups.items()}
 
-        user_prompt = f"""Extract ONLY operational metrics (Cash Flow, Collection Days, Payment Days, Inventory Days) from this preprocessed text:
+    async def process_financial_batch_async(self, raw_texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Extract slide data for several reports, stacking up to BATCH_SIZE
+        reports into each AI call.
 
-{preprocessed_text}
+        Each call shares one system prompt and one response for many
+        reports instead of a round trip per report; calls for successive
+        groups run concurrently. Reports the batched response leaves out are
+        extracted individually with extract_financial_data_onepass_async.
 
-Focus on:
-        - Cash flow trends and liquidity with BREAKDOWN by Operating/Investing/Financing activities
-        - For Cash Flow: Extract Operating, Investing, and Financing cash flows for each period
-        - Customer collection efficiency
-        - Supplier payment terms
-        - Inventory turnover metrics
-        - Sort chart_data chronologically
-        - Include percentage changes and insights"""
+        Args:
+            raw_texts: Raw, unstructured financial texts, one per report
+        Returns:
+            Parsed financial data for each report, in input order
+        """
+        groups = [raw_texts[i:i + self.BATCH_SIZE] for i in range(0, len(raw_texts), self.BATCH_SIZE)]
+        print(f"📦 Batch processing {len(raw_texts)} reports in {len(groups)} call(s)...")
+        results = await asyncio.gather(*(self._extract_report_group_async(group) for group in groups))
+        return [report for group_result in results for report in group_result]
+
+    async def _extract_report_group_async(self, raw_texts: List[str]) -> List[Dict[str, Any]]:
+        """Extract one stacked group of reports; see process_financial_batch_async."""
+        sections = "\n\n".join(
+            f"=== REPORT {i} ===\n{_prefilter_for_extraction(text)}"
+            for i, text in enumerate(raw_texts, 1)
+        )
+        user_prompt = f"""Parse each of these {len(raw_texts)} raw financial reports independently and extract all metrics with their values and dates:
+
+{sections}
+
+Return a JSON object {{"reports": [...]}} with exactly {len(raw_texts)} entries, one per report in the order given, each with the slide data structure."""
 
         messages = [
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": _ONEPASS_SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt}
         ]
-        
+
+        reports: List[Any] = []
+        key = self._completion_cache_key(messages, ReportBatch)
         try:
-            thread_id = threading.get_ident()
-            print(f"🟢 Operational extraction starting on thread {thread_id}")
-            response = self.ai_service.generate_completion(messages)
-            print(f"🟢 Operational extraction completed on thread {thread_id}")
-            return self._parse_json_response(response, "Operational Metrics")
+            response = await self._cached_completion(messages, response_model=ReportBatch, store=False)
+            try:
+                batch = ReportBatch.model_validate_json(response)
+                reports = [report.model_dump(by_alias=True, exclude_none=True) for report in batch.reports]
+                if len(reports) == len(raw_texts):
+                    self._store_response(key, response)
+            except ValidationError:
+                self._evict_response(key)
+                repaired = repair_json(response, return_objects=True)
+                if isinstance(repaired, dict) and isinstance(repaired.get("reports"), list):
+                    reports = repaired["reports"]
         except Exception as e:
-            print(f"❌ Operational metrics extraction failed: {str(e)}")
-            return {"metrics": []}
+            print(f"❌ Batched extraction failed: {str(e)}")
+            self._evict_response(key)
+
+        if len(reports) != len(raw_texts):
+            # A report count mismatch means reports cannot be matched to inputs
+            print(f"⚠️  Batch returned {len(reports)} of {len(raw_texts)} reports, extracting individually...")
+            self._evict_response(key)
+            return list(await asyncio.gather(
+                *(self.extract_financial_data_onepass_async(text) for text in raw_texts)
+            ))
+
+        for report in reports:
+            for metric in report.get("metrics", []) if isinstance(report, dict) else []:
+                self._sort_metric_chart_data(metric)
+        return reports
+
+    def process_financial_batch(self, raw_texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Synchronous wrapper around process_financial_batch_async.
+
+        Args:
+            raw_texts: Raw, unstructured financial texts, one per report
+        Returns:
+            Parsed financial data for each report, in input order
+        """
+        return _run_sync(self.process_financial_batch_async(raw_texts))
 
     async def process_financial_data_with_threadpool_concurrency(
         self,
@@ -590,12 +2065,17 @@ Focus on:
         output_dir: str = "generated_slides"
     ) -> Dict[str, Any]:
         """
-        Process financial data with TRUE parallel execution using ThreadPoolExecutor
+        Process financial data with one preprocessing call and one combined
+        extraction call.
+
+        The per-group extract_*_async methods are kept for callers that still
+        want them, as slices of the same combined call.
         """
         import time
         total_start = time.time()
+        self._report_timestamp = datetime.now()
         
-        print("🚀 Starting ThreadPoolExecutor parallel financial data processing...")
+        print("🚀 Starting financial data processing...")
         
         # Step 1: Preprocess the text (still sequential as it's needed for all extractions)
         preprocess_start = time.time()
@@ -603,252 +2083,57 @@ Focus on:
         preprocess_duration = time.time() - preprocess_start
         print(f"📝 Preprocessing completed in {preprocess_duration:.2f}s")
         
-        # Step 2: Run THREE truly parallel extractions using ThreadPoolExecutor
+        # Step 2: One extraction call covering all three metric groups
         extraction_start = time.time()
         
-        print("⚡ Starting TRULY PARALLEL extractions with ThreadPoolExecutor...")
-        
-        # Use ThreadPoolExecutor for true parallelism
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            # Submit all tasks to thread pool
-            revenue_future = loop.run_in_executor(
-                executor, 
-                self.extract_revenue_metrics_sync, 
-                preprocessed_text
-            )
-            profitability_future = loop.run_in_executor(
-                executor, 
-                self.extract_profitability_metrics_sync, 
-                preprocessed_text
-            )
-            operational_future = loop.run_in_executor(
-                executor, 
-                self.extract_operational_metrics_sync, 
-                preprocessed_text
-            )
-            
-            # Wait for all tasks to complete
-            revenue_result, profitability_result, operational_result = await asyncio.gather(
-                revenue_future,
-                profitability_future,
-                operational_future,
-                return_exceptions=True
-            )
+        print("⚡ Starting combined extraction...")
+        result = await self.extract_all_metrics_async(preprocessed_text)
         
         extraction_duration = time.time() - extraction_start
-        print(f"🎯 ThreadPool parallel extractions completed in {extraction_duration:.2f}s")
+        print(f"🎯 Combined extraction completed in {extraction_duration:.2f}s")
+        
+        groups = self._group_metrics_by_category(result)
         
         # Step 3: Merge results
         merge_start = time.time()
         merged_result = self._merge_concurrent_extractions(
-            revenue_result, profitability_result, operational_result
+            groups["revenue"], groups["profitability"], groups["operational"]
         )
         merge_duration = time.time() - merge_start
         
         total_duration = time.time() - total_start
         
         print(f"🔄 Results merged in {merge_duration:.2f}s")
-        print(f"🏁 Total ThreadPool parallel processing: {total_duration:.2f}s")
+        print(f"🏁 Total processing: {total_duration:.2f}s")
         print(f"📊 Performance breakdown:")
         print(f"   - Preprocessing: {preprocess_duration:.2f}s ({preprocess_duration/total_duration*100:.1f}%)")
-        print(f"   - Parallel Extraction: {extraction_duration:.2f}s ({extraction_duration/total_duration*100:.1f}%)")
+        print(f"   - Extraction: {extraction_duration:.2f}s ({extraction_duration/total_duration*100:.1f}%)")
         print(f"   - Merging: {merge_duration:.2f}s ({merge_duration/total_duration*100:.1f}%)")
         
         return merged_result
 
     async def extract_revenue_metrics_async(self, preprocessed_text: str) -> Dict[str, Any]:
-        """Extract revenue-related metrics concurrently"""
-        system_prompt = """You are a financial data analyst specializing in REVENUE METRICS. Extract ONLY these metrics from the preprocessed financial text:
-
-1. Income (Revenue/Sales)
-2. Gross Profit
-3. Cost of Sale (COGS/Cost of Goods Sold)
-
-Return ONLY valid JSON with this structure:
-{
-    "metrics": [
-        {
-            "name": "Income",
-            "value": "$155,815",
-            "label": "Peak Revenue (Dec 2020)",
-            "kpis": {
-                "vs_previous": {"pct": -44.6, "from": 9384, "to": 5200},
-                "previous_label": "Aug 2024",
-                "latest_label": "Sep 2024"
-            },
-            "bullet_points": [
-                "Key insight with specific numbers and trends",
-                "Another insight with root causes if mentioned"
-            ],
-            "chart_data": [
-                {"name": "May 2019", "series1": 8321, "series2": 0, "series3": 0}
-            ]
-        }
-    ]
-}"""
-
-        user_prompt = f"""Extract ONLY revenue-related metrics (Income, Gross Profit, Cost of Sale) from this preprocessed text:
-
-{preprocessed_text}
-
-Focus on:
-- All revenue/income values with time periods
-- Gross profit calculations and trends
-- Cost of goods sold data
-- Sort chart_data chronologically
-- Include percentage changes and insights"""
-
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
-        
-        try:
-            response = self.ai_service.generate_completion(messages)
-            return self._parse_json_response(response, "Revenue Metrics")
-        except Exception as e:
-            print(f"❌ Revenue metrics extraction failed: {str(e)}")
-            return {"metrics": []}
+        """Extract revenue-related metrics (slice of extract_all_metrics_async)"""
+        result = await self.extract_all_metrics_async(preprocessed_text)
+        return self._group_metrics_by_category(result)["revenue"]
 
     async def extract_profitability_metrics_async(self, preprocessed_text: str) -> Dict[str, Any]:
-        """Extract profitability-related metrics concurrently"""
-        system_prompt = """You are a financial data analyst specializing in PROFITABILITY METRICS. Extract ONLY these metrics from the preprocessed financial text:
-
-1. EBITDA
-2. Net Income
-3. Expenses (Operating Expenses)
-
-Return ONLY valid JSON with this structure:
-{
-    "metrics": [
-        {
-            "name": "EBITDA",
-            "value": "$45,200",
-            "label": "Strong EBITDA (Q3 2024)",
-            "kpis": {
-                "vs_previous": {"pct": 15.2, "from": 39200, "to": 45200},
-                "previous_label": "Q2 2024",
-                "latest_label": "Q3 2024"
-            },
-            "bullet_points": [
-                "Key insight with specific numbers and trends",
-                "Another insight with root causes if mentioned"
-            ],
-            "chart_data": [
-                {"name": "Q1 2024", "series1": 35000, "series2": 0, "series3": 0}
-            ]
-        }
-    ]
-}"""
-
-        user_prompt = f"""Extract ONLY profitability metrics (EBITDA, Net Income, Operating Expenses) from this preprocessed text:
-
-{preprocessed_text}
-
-Focus on:
-- EBITDA values and calculations
-- Net income trends over time
-- Operating expense breakdowns
-- Sort chart_data chronologically
-- Include percentage changes and insights"""
-
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
-        
-        try:
-            response = self.ai_service.generate_completion(messages)
-            return self._parse_json_response(response, "Profitability Metrics")
-        except Exception as e:
-            print(f"❌ Profitability metrics extraction failed: {str(e)}")
-            return {"metrics": []}
+        """Extract profitability-related metrics (slice of extract_all_metrics_async)"""
+        result = await self.extract_all_metrics_async(preprocessed_text)
+        return self._group_metrics_by_category(result)["profitability"]
 
     async def extract_operational_metrics_async(self, preprocessed_text: str) -> Dict[str, Any]:
-        """Extract operational efficiency metrics concurrently"""
-        system_prompt = """You are a financial data analyst specializing in OPERATIONAL METRICS. Extract ONLY these metrics from the preprocessed financial text:
-
-1. Cash Flow
-2. Customer Collection Days
-3. Supplier Payment Days
-4. Inventory Days
-
-Return ONLY valid JSON with this structure:
-{
-    "metrics": [
-        {
-            "name": "Cash Flow",
-            "value": "$125,000",
-            "label": "Net Cash Flow",
-            "kpis": {
-                "vs_previous": {"pct": -12.5, "from": 142857, "to": 125000},
-                "previous_label": "Previous Month",
-                "latest_label": "Current Month"
-            },
-            "bullet_points": [
-                "Key insight with specific numbers and trends",
-                "Another insight with root causes if mentioned"
-            ],
-            "chart_data": [
-                {"name": "Jan 2024", "series1": 150000, "series2": -50000, "series3": -30000},
-                {"name": "Feb 2024", "series1": 180000, "series2": -60000, "series3": -40000}
-            ]
-        }
-    ]
-}
-
-CRITICAL for Cash Flow metric:
-- series1 = Operating Activities (cash from operations)
-- series2 = Investing Activities (cash from investments, usually negative)
-- series3 = Financing Activities (cash from financing, can be positive or negative)
-- Extract ALL three components for EACH period if mentioned in the text
-- If a component is not mentioned for a period, use 0
-- Sort chart_data chronologically"""
-
-        user_prompt = f"""Extract ONLY operational metrics (Cash Flow, Collection Days, Payment Days, Inventory Days) from this preprocessed text:
-
-{preprocessed_text}
-
-Focus on:
-        - Cash flow trends and liquidity with BREAKDOWN by Operating/Investing/Financing activities
-        - For Cash Flow: Extract Operating, Investing, and Financing cash flows for each period
-        - Customer collection efficiency
-        - Supplier payment terms
-        - Inventory turnover metrics
-        - Sort chart_data chronologically
-        - Include percentage changes and insights"""
-
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
-        
-        try:
-            response = self.ai_service.generate_completion(messages)
-            return self._parse_json_response(response, "Operational Metrics")
-        except Exception as e:
-            print(f"❌ Operational metrics extraction failed: {str(e)}")
-            return {"metrics": []}
+        """Extract operational efficiency metrics (slice of extract_all_metrics_async)"""
+        result = await self.extract_all_metrics_async(preprocessed_text)
+        return self._group_metrics_by_category(result)["operational"]
 
     def _parse_json_response(self, response: str, metric_type: str) -> Dict[str, Any]:
         """Helper method to parse JSON response from AI"""
         try:
-            # Clean the response
-            response = response.strip()
-            if response.startswith('```json'):
-                response = response[7:]
-            if response.endswith('```'):
-                response = response[:-3]
-            response = response.strip()
-            
-            # Try to find JSON in the response
-            json_start = response.find('{')
-            json_end = response.rfind('}') + 1
-            if json_start != -1 and json_end > json_start:
-                response = response[json_start:json_end]
+            # Cut the JSON object out of any surrounding markdown or prose
+            response = _first_json_object(response)
             
-            parsed_data = json.loads(response)
+            parsed_data = _loads_json(response)
             print(f"✅ {metric_type} extraction successful: {len(parsed_data.get('metrics', []))} metrics")
             return parsed_data
             
@@ -864,9 +2149,13 @@ Focus on:
     ) -> Dict[str, Any]:
         """
         Process financial data with TRUE concurrency - split extraction into parallel tasks
+
+        The three group extractors slice one combined completion;
+        _cached_completion shares that single in-flight request between them.
         """
         import time
         total_start = time.time()
+        self._report_timestamp = datetime.now()
         
         print("🚀 Starting TRUE concurrent financial data processing...")
         
@@ -922,323 +2211,140 @@ Focus on:
     ) -> Dict[str, Any]:
         """Merge results from concurrent extractions into final structure"""
         
-        # Handle exceptions from asyncio.gather
-        if isinstance(revenue_result, Exception):
-            print(f"❌ Revenue extraction failed: {revenue_result}")
-            revenue_result = {"metrics": []}
-        if isinstance(profitability_result, Exception):
-            print(f"❌ Profitability extraction failed: {profitability_result}")
-            profitability_result = {"metrics": []}
-        if isinstance(operational_result, Exception):
-            print(f"❌ Operational extraction failed: {operational_result}")
-            operational_result = {"metrics": []}
-        
-        # Combine all metrics
+        # Handle exceptions from asyncio.gather and combine all metrics in one pass
         all_metrics = []
-        all_metrics.extend(revenue_result.get("metrics", []))
-        all_metrics.extend(profitability_result.get("metrics", []))
-        all_metrics.extend(operational_result.get("metrics", []))
+        group_counts = []
+        for label, icon, result in (
+            ("Revenue", "📈", revenue_result),
+            ("Profitability", "💰", profitability_result),
+            ("Operational", "⚙️", operational_result),
+        ):
+            if isinstance(result, Exception):
+                print(f"❌ {label} extraction failed: {result}")
+                result = {"metrics": []}
+            metrics = result.get("metrics", [])
+            all_metrics.extend(metrics)
+            group_counts.append((label, icon, len(metrics)))
         
         # Create final structure
         merged_data = {
             "title": "Financial Analysis Report",
             "subtitle": f"Concurrent Analysis - {len(all_metrics)} Metrics",
-            "date": datetime.now().strftime("%Y-%m-%d"),
+            "date": self._report_time().strftime("%Y-%m-%d"),
             "metrics": all_metrics
         }
         
         print(f"✅ Merged {len(all_metrics)} metrics from concurrent extractions")
-        print(f"📈 Revenue metrics: {len(revenue_result.get('metrics', []))}")
-        print(f"💰 Profitability metrics: {len(profitability_result.get('metrics', []))}")
-        print(f"⚙️ Operational metrics: {len(operational_result.get('metrics', []))}")
-        
-        return merged_data
-
-    def generate_financial_slides(
-        self,
-        financial_text: str,
-        output_dir: str = "generated_slides"
-    ) -> Dict[str, Any]:
-        """
-        Generate TSX slide components from financial text.
-        
-        Args:
-            financial_text: Raw financial analysis text
-            output_dir: Directory to save generated slides
-        Returns:
-            Parsed financial data in JSON format
-        """
-        system_prompt = """You are a financial data analyst. Parse financial text and extract structured data for TSX slides.
-
-Extract metrics: Income, Revenue, Gross Profit, EBITDA, Net Income, Cost of Sales, Operating Expenses, Collection Days, Payment Days, Inventory Days.
-
-Return ONLY valid JSON with this structure:
-{
-    "title": "Financial Analysis Report",
-    "subtitle": "Period Range",
-    "date": "Current Date",
-    "metrics": [
-        {
-            "name": "Income",
-            "value": "$155,815",
-            "label": "Peak Revenue (Dec 2020)",
-            "kpis": {
-                "vs_previous": {"pct": -44.6, "from": 9384, "to": 5200},
-                "previous_label": "Aug 2024",
-                "latest_label": "Sep 2024"
-            },
-            "bullet_points": [
-                "Key insight with specific numbers and trends",
-                "Another insight with root causes if mentioned"
-            ],
-            "chart_data": [
-                {"name": "May 2019", "series1": 8321, "series2": 0, "series3": 0}
-            ]
-        }
-    ],
-}"""
-
-        user_prompt = f"""Parse this financial text and extract all metrics with their values and dates:
-
-{financial_text}
-
-INSTRUCTIONS:
-1. Extract all metrics: Income, Gross Profit, EBITDA, Cost of Sales, Collection Days, Payment Days, Inventory Days, Operating Expenses
-2. For each metric, get all values with time periods
-3. Sort chart_data chronologically (oldest to newest)
-4. Include root causes and explanations from the text
-
-EXAMPLE: "Income $88,912 in Feb 2021 vs $84,629 in Jan 2021"
-- chart_data: [
-    {{"name": "Jan 2021", "series1": 84629, "series2": 0, "series3": 0}},
-    {{"name": "Feb 2021", "series1": 88912, "series2": 0, "series3": 0}}
-  ]
-
-Each metric needs:
-1. "name": Metric name
-2. "value": Latest/most significant value with $
-3. "label": Descriptive label
-4. "chart_data": All data points sorted chronologically
-5. "kpis": Percentage changes with vs_previous and yoy
-6. "bullet_points": 2-3 key insights with numbers, trends, and any root causes mentioned
-
-Return valid JSON with all metrics and data points."""
-
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
-        
-        try:
-            import time
-            ai_start = time.time()
-            response = self.ai_service.generate_completion(messages)
-            ai_duration = time.time() - ai_start
-            
-            # Debug: Print raw response to diagnose parsing issues
-            print(f"\n� Raw AI Response (All): {response}")
-            print(f"⚡ AI Response received in {ai_duration:.2f}s")
-            
-            # Clean the response - sometimes AI adds extra text
-            response = response.strip()
-            if response.startswith('```json'):
-                response = response[7:]
-            if response.endswith('```'):
-                response = response[:-3]
-            response = response.strip()
-            
-            # Try to find JSON in the response
-            json_start = response.find('{')
-            json_end = response.rfind('}') + 1
-            if json_start != -1 and json_end > json_start:
-                response = response[json_start:json_end]
-            
-            # Enhanced JSON parsing with error recovery
-            try:
-                parsed_data = json.loads(response)
-            except json.JSONDecodeError as json_error:
-                print(f"🔧 JSON parsing failed, attempting to fix common issues...")
-                print(f"   Error: {json_error}")
-                
-                # Common fixes for malformed JSON
-                fixed_response = response
-                
-                # Fix trailing commas
-                import re
-                fixed_response = re.sub(r',(\s*[}\]])', r'\1', fixed_response)
-                
-                # Fix missing commas between objects
-                fixed_response = re.sub(r'}\s*{', '},{', fixed_response)
-                
-                # Fix unescaped quotes in strings
-                fixed_response = re.sub(r'(?<!\\)"(?=[^,}\]]*[,}\]])', r'\\"', fixed_response)
-                
-                # Try parsing again
-                try:
-                    parsed_data = json.loads(fixed_response)
-                    print(f"✅ JSON fixed and parsed successfully!")
-                except json.JSONDecodeError as second_error:
-                    print(f"❌ JSON still invalid after fixes: {second_error}")
-                    print(f"🔍 Problematic JSON (first 500 chars): {fixed_response[:500]}...")
-                    raise json_error  # Raise original error
-            
-            # Sort chart_data chronologically for each metric
-            for metric in parsed_data.get('metrics', []):
-                if 'chart_data' in metric and metric['chart_data']:
-                    original_data = metric['chart_data'].copy()
-                    metric['chart_data'] = self._sort_chart_data_chronologically(metric['chart_data'])
-                    
-                    # Check if sorting changed the order
-                    if original_data != metric['chart_data']:
-                        print(f"   📅 Sorted {metric.get('name')} data chronologically")
-            
-            # Debug: Print what AI extracted
-            print(f"\n🤖 AI Extracted Data:")
-            print(f"   Metrics count: {len(parsed_data.get('metrics', []))}")
-            for metric in parsed_data.get('metrics', []):  # Show ALL metrics
-                chart_data = metric.get('chart_data', [])
-                print(f"   - {metric.get('name')}: {len(chart_data)} data points")
-                if chart_data:
-                    for i, point in enumerate(chart_data[:3]):  # Show first 3 points
-                        print(f"     [{i+1}] {point.get('name')}: ${point.get('series1', 0):,}")
-                else:
-                    print(f"     ⚠️  NO CHART DATA EXTRACTED!")
-            
-            return parsed_data
-        except json.JSONDecodeError as e:
-            print(f"⚠️  JSON parsing error: {e}")
-            print(f"⚠️  Problematic response: {response[:500]}...")
-            return self._create_default_structure(financial_text)
-        except Exception as e:
-            print(f"⚠️  Error generating data: {e}")
-            print(f"⚠️  Response received: {response if 'response' in locals() else 'No response received'}")
-            return self._create_default_structure(financial_text)
+        for label, icon, count in group_counts:
+            print(f"{icon} {label} metrics: {count}")
+        
+        return merged_data
+
+    def generate_financial_slides(
+        self,
+        financial_text: str,
+        output_dir: str = "generated_slides",
+        force_refresh: bool = False,
+        write_title_early: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Generate TSX slide components from financial text.
+
+        Synchronous wrapper around generate_financial_slides_async.
+        
+        Args:
+            financial_text: Raw financial analysis text
+            output_dir: Directory to save generated slides
+            force_refresh: Ignore a cached AI response for this text
+            write_title_early: Write the title slide while the rest of the
+                response is still streaming
+        Returns:
+            Parsed financial data in JSON format
+        """
+        return _run_sync(
+            self.generate_financial_slides_async(financial_text, output_dir, force_refresh, write_title_early)
+        )
+
+    def generate_financial_slides_batch(
+        self,
+        financial_texts: List[str],
+        output_dir: str = "generated_slides",
+        poll_interval: float = 60.0
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate slide data for many reports through the provider's Batch API.
+
+        For offline runs such as nightly regeneration or backfills: the batch
+        is billed at half price and avoids rate-limit contention, but can take
+        up to 24 hours. Texts with a cached response are not resubmitted, and
+        batch responses are cached, so the parsing below reuses the normal
+        generate_financial_slides_async path. Requests the batch could not
+        complete fall back to a live call.
+
+        Args:
+            financial_texts: Preprocessed financial text, one per report
+            output_dir: Directory to save generated slides
+            poll_interval: Seconds between batch status checks
+        Returns:
+            Parsed financial data per report, in input order
+        """
+        model = self.ai_service.extraction_model
+        keys = [
+            self._completion_cache_key(self._slide_messages(text), ReportData, model)
+            for text in financial_texts
+        ]
+        pending = {key: text for key, text in zip(keys, financial_texts) if self._cached_response(key) is None}
+        if pending:
+            responses = self.ai_service.run_batch(
+                [self._slide_messages(text) for text in pending.values()],
+                temperature=0,
+                response_model=ReportData,
+                model=model,
+                poll_interval=poll_interval,
+            )
+            for key, response in zip(pending, responses):
+                if response is not None:
+                    self._store_response(key, response)
+
+        async def parse_all() -> List[Dict[str, Any]]:
+            return await asyncio.gather(*(
+                self.generate_financial_slides_async(text, output_dir) for text in financial_texts
+            ))
+
+        return _run_sync(parse_all())
     
     def _create_default_structure(self, financial_text: str) -> Dict[str, Any]:
         """Create default structure if AI parsing fails."""
         return {
             "title": "Financial Analysis Report",
             "subtitle": "Comprehensive Financial Overview",
-            "date": datetime.now().strftime("%B %Y"),
+            "date": self._report_time().strftime("%B %Y"),
             "metrics": [],
             "comparisons": None
         }
     
     def _generate_title_slide(self, data: Dict[str, Any], output_path: Path) -> str:
         """Generate TitleSlide.tsx component."""
-        tsx_content = f'''import * as z from "zod";
-import {{ ImageSchema }} from "../defaultSchemes";
-
-export const layoutName = "Financial Report Title";
-export const layoutId = "financial-title-slide";
-export const layoutDescription = "Title slide for financial analysis report";
-
-export const Schema = z.object({{
-  organizationName: z.string().default("Financial Analysis"),
-  primaryTitle: z.string().default("{data.get('title', 'FINANCIAL REPORT')}"),
-  secondaryTitle: z.string().default("{data.get('subtitle', 'COMPREHENSIVE ANALYSIS')}"),
-  brandLogo: ImageSchema.default({{
-    __image_url__: "https://via.placeholder.com/40x40/14B8A6/FFFFFF?text=FA",
-    __image_prompt__: "Financial analytics logo with chart symbol"
-  }}),
-  contactDetails: z.object({{
-    phoneNumber: z.string().default("+1-234-567-8900"),
-    physicalAddress: z.string().default("West London, UK"),
-    websiteUrl: z.string().default("www.app.DashAnalytix.com")
-  }}).default({{
-    phoneNumber: "+1-234-567-8900",
-    physicalAddress: "West London, UK",
-    websiteUrl: "www.app.DashAnalytix.com"
-  }}),
-  presentationDate: z.string().default("{data.get('date', datetime.now().strftime('%B %Y'))}"),
-  showDecorations: z.boolean().default(true),
-  showNavigationArrow: z.boolean().default(true),
-}});
-
-type SchemaType = z.infer<typeof Schema>;
-
-const FinancialTitleSlide = ({{ data }}: {{ data: Partial<SchemaType> }}) => {{
-  const {{
-    organizationName,
-    primaryTitle,
-    secondaryTitle,
-    brandLogo,
-    contactDetails,
-    presentationDate,
-    showDecorations,
-    showNavigationArrow,
-  }} = data;
-
-  return (
-    <div className="aspect-video max-w-[1280px] w-full bg-white relative overflow-hidden">
-      <div className="absolute top-0 left-0 right-0 px-16 py-8 flex justify-between items-center z-20">
-        <div className="flex items-center space-x-3">
-          {{brandLogo?.__image_url__ && (
-            <div className="w-10 h-10">
-              <img src={{brandLogo.__image_url__}} alt={{brandLogo.__image_prompt__}} className="w-full h-full object-contain" />
-            </div>
-          )}}
-          {{organizationName && <span className="text-2xl font-bold text-gray-900">{{organizationName}}</span>}}
-        </div>
-        {{showNavigationArrow && (
-          <div className="w-12 h-12 bg-teal-600 rounded-full flex items-center justify-center">
-            <svg className="w-6 h-6 text-white" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-              <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={{2}} d="M9 5l7 7-7 7" />
-            </svg>
-          </div>
-        )}}
-      </div>
-
-      {{showDecorations && <div className="absolute top-20 right-16 w-96 h-96 bg-yellow-100 rounded-full opacity-60 z-10"></div>}}
-
-      <div className="relative h-full flex flex-col justify-center px-16">
-        <div>
-          {{primaryTitle && <h1 className="text-4xl lg:text-5xl font-black text-teal-700 leading-none tracking-tight mb-4">{{primaryTitle}}</h1>}}
-          {{secondaryTitle && (
-            <div className="flex items-center space-x-4 mb-12">
-              <div className="w-4 h-4 bg-teal-600 rounded-full"></div>
-              <h2 className="text-xl font-bold text-gray-800 tracking-wide">{{secondaryTitle}}</h2>
-            </div>
-          )}}
-        </div>
-      </div>
-
-      <div className="absolute bottom-0 left-0 right-0 px-16 py-8 border-t-2 border-gray-300">
-        <div className="flex justify-between items-center text-gray-700">
-          <div className="flex space-x-16 text-sm">
-            {{contactDetails?.phoneNumber && (
-              <div><div className="font-semibold text-gray-900 mb-1">Telephone</div><div>{{contactDetails.phoneNumber}}</div></div>
-            )}}
-            {{contactDetails?.physicalAddress && (
-              <div><div className="font-semibold text-gray-900 mb-1">Address</div><div>{{contactDetails.physicalAddress}}</div></div>
-            )}}
-            {{contactDetails?.websiteUrl && (
-              <div><div className="font-semibold text-gray-900 mb-1">Website</div><div>{{contactDetails.websiteUrl}}</div></div>
-            )}}
-          </div>
-          {{presentationDate && <div className="text-right"><div className="text-lg font-bold text-gray-900">{{presentationDate}}</div></div>}}
-        </div>
-      </div>
-    </div>
-  );
-}};
-
-export default FinancialTitleSlide;
-'''
+        tsx_content = self.TEMPLATES["title"].substitute(
+            primary_title=data.get('title', 'FINANCIAL REPORT'),
+            secondary_title=data.get('subtitle', 'COMPREHENSIVE ANALYSIS'),
+            presentation_date=data['date'] if 'date' in data else self._report_time().strftime('%B %Y'),
+        )
         
         file_path = output_path / "FinancialTitleSlide.tsx"
-        file_path.write_text(tsx_content)
+        self._write_slide(file_path, tsx_content)
         print(f"  ✓ Created: {file_path}")
         return str(file_path)
     
     def _generate_statistic_slide(self, metric: Dict[str, Any], output_path: Path) -> str:
         """Generate StatisticSlide.tsx for a metric."""
         metric_name = metric.get("name", "Metric")
-        safe_name = metric_name.replace(" ", "")
+        name_fields = _statistic_name_fields(metric_name)
+        safe_name = name_fields["safe_name"]
         
         # Format chart data
-        chart_data_str = json.dumps(metric.get("chart_data", []), indent=6)
-        bullet_points_str = json.dumps(metric.get("bullet_points", []), indent=6)
+        chart_data_str = _dumps_json(metric.get("chart_data", []))
+        bullet_points_str = _dumps_json(metric.get("bullet_points", []))
         
         # Prepare KPI strings from computed kpis with intelligent period detection
         k = metric.get("kpis") or {}
@@ -1247,63 +2353,13 @@ export default FinancialTitleSlide;
         prev_label = (k or {}).get("previous_label") or ""
         latest_label = (k or {}).get("latest_label") or ""
         
-        def detect_comparison_type(prev_label, latest_label):
-            """Intelligently detect if comparison is MoM, QoQ, YoY, etc."""
-            if not prev_label or not latest_label:
-                return "vs Previous"
-            
-            # Convert to lowercase for easier matching
-            prev = prev_label.lower()
-            latest = latest_label.lower()
-            
-            # Extract years if present
-            import re
-            prev_year = re.search(r'20\d{{2}}', prev)
-            latest_year = re.search(r'20\d{{2}}', latest)
-            
-            # Extract months if present
-            months = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 
-                     'jul', 'aug', 'sep', 'oct', 'nov', 'dec',
-                     'january', 'february', 'march', 'april', 'may', 'june',
-                     'july', 'august', 'september', 'october', 'november', 'december']
-            
-            prev_has_month = any(month in prev for month in months)
-            latest_has_month = any(month in latest for month in months)
-            
-            # Extract quarters if present
-            quarters = ['q1', 'q2', 'q3', 'q4', 'quarter']
-            prev_has_quarter = any(quarter in prev for quarter in quarters)
-            latest_has_quarter = any(quarter in latest for quarter in quarters)
-            
-            # Year-over-Year detection
-            if prev_year and latest_year:
-                prev_year_val = int(prev_year.group())
-                latest_year_val = int(latest_year.group())
-                if abs(latest_year_val - prev_year_val) >= 1:
-                    return f"YoY ({prev_label} → {latest_label})"
-            
-            # Quarter-over-Quarter detection
-            if prev_has_quarter and latest_has_quarter:
-                return f"QoQ ({prev_label} → {latest_label})"
-            
-            # Month-over-Month detection
-            if prev_has_month and latest_has_month:
-                # Same year, different months = MoM
-                if prev_year and latest_year and prev_year.group() == latest_year.group():
-                    return f"MoM ({prev_label} → {latest_label})"
-                # Different years but consecutive months = MoM (e.g., Dec 2020 → Jan 2021)
-                return f"MoM ({prev_label} → {latest_label})"
-            
-            # Default fallback
-            return f"vs Previous ({prev_label} → {latest_label})"
-        
         kpi_prev_percent = ""
         kpi_prev_label = ""
         if vs is not None and isinstance(vs, dict) and vs.get("pct") is not None:
             sign = "+" if vs.get("pct", 0) >= 0 else ""
             kpi_prev_percent = f"{sign}{vs.get('pct')}%"
-            kpi_prev_label = detect_comparison_type(prev_label, latest_label)
-            print(f"  📊 KPI Previous: {kpi_prev_percent} ({kpi_prev_label})")
+            kpi_prev_label = _detect_comparison_type(prev_label, latest_label)
+            logger.debug("KPI Previous: %s (%s)", kpi_prev_percent, kpi_prev_label)
         
         # Handle YoY separately if provided
         kpi_yoy_percent = ""
@@ -1313,275 +2369,212 @@ export default FinancialTitleSlide;
             kpi_yoy_percent = f"{sign}{yoy.get('pct')}%"
             yoy_prev = (k or {}).get("yoy_previous_label") or ""
             yoy_latest = (k or {}).get("yoy_latest_label") or ""
-            kpi_yoy_label = detect_comparison_type(yoy_prev, yoy_latest) if yoy_prev and yoy_latest else "YoY"
-            print(f"  📊 KPI YoY: {kpi_yoy_percent} ({kpi_yoy_label})")
+            kpi_yoy_label = _detect_comparison_type(yoy_prev, yoy_latest) if yoy_prev and yoy_latest else "YoY"
+            logger.debug("KPI YoY: %s (%s)", kpi_yoy_percent, kpi_yoy_label)
         
         if not kpi_prev_percent and not kpi_yoy_percent:
             print(f"  ⚠️  NO KPI DATA found for {metric_name} - check AI extraction")
         
-        tsx_content = f'''import React from "react";
-import * as z from "zod";
-import {{ ImageSchema }} from "../defaultSchemes";
-import {{ ChartContainer, ChartTooltip, ChartTooltipContent }} from "@/components/ui/chart";
-import {{ LineChart, Line, XAxis, YAxis, CartesianGrid }} from "recharts";
-
-export const layoutName = "{metric_name} Statistics";
-export const layoutId = "{safe_name.lower()}-statistic-slide";
-export const layoutDescription = "Financial statistics for {metric_name}";
-
-export const Schema = z.object({{
-  sectionTitle: z.string().default("{metric_name.upper()}"),
-  sectionSubtitle: z.string().default("FINANCIAL PERFORMANCE ANALYSIS"),
-  statisticValue: z.string().default("{metric.get('value', 'N/A')}"),
-  statisticLabel: z.string().default("{metric.get('label', metric_name)}"),
-  // KPI fields (populated from computed time-series)
-  kpiPrevPercent: z.string().default("{kpi_prev_percent}"),
-  kpiPrevLabel: z.string().default("{kpi_prev_label}"),
-  kpiYoyPercent: z.string().default("{kpi_yoy_percent}"),
-  kpiYoyLabel: z.string().default("{kpi_yoy_label}"),
-  supportingVisual: ImageSchema.default({{
-    __image_url__: "https://images.unsplash.com/photo-1460925895917-afdab827c52f?w=800&q=80",
-    __image_prompt__: "Financial analytics dashboard with charts and data"
-  }}),
-  bulletPoints: z.array(z.string()).default({bullet_points_str}),
-  chartData: z.array(z.object({{
-    name: z.string(),
-    series1: z.number(),
-    series2: z.number(),
-    series3: z.number(),
-  }})).default({chart_data_str}),
-  showYellowUnderline: z.boolean().default(true),
-  showVisualAccents: z.boolean().default(true),
-}});
-
-const chartConfig = {{
-  series1: {{ label: "Value", color: "#061551" }},
-  series2: {{ label: "Trend", color: "#0e68b3" }},
-  series3: {{ label: "Target", color: "#32bbd8" }},
-}};
-
-type SchemaType = z.infer<typeof Schema>;
-
-const {safe_name}StatisticSlide = ({{ data }}: {{ data: Partial<SchemaType> }}) => {{
-  const {{ sectionTitle, sectionSubtitle, statisticValue, statisticLabel, supportingVisual, bulletPoints, chartData, showYellowUnderline, showVisualAccents }} = data;
-
-  return (
-    <div className="aspect-video max-w-[1280px] w-full bg-white relative overflow-hidden">
-      <div className="h-full flex">
-        <div className="w-1/2 relative bg-teal-600 px-16 py-12 flex flex-col text-white">
-          <div className="mb-8">
-            {{sectionTitle && <h1 className="text-3xl lg:text-4xl font-black leading-tight mb-4">{{sectionTitle}}</h1>}}
-            {{sectionSubtitle && <p className="text-base font-semibold tracking-wide mb-4">{{sectionSubtitle}}</p>}}
-            {{showYellowUnderline && <div className="w-24 h-1 bg-yellow-300 mb-8"></div>}}
-          </div>
-          
-          <div className="mb-8">
-            {{statisticValue && <div className="text-8xl font-black text-yellow-300 mb-4">{{statisticValue}}</div>}}
-            {{statisticLabel && <h2 className="text-2xl font-bold">{{statisticLabel}}</h2>}}
-          </div>
-          
-          {{supportingVisual?.__image_url__ && (
-            <div className="flex-1 flex items-end">
-              <div className="w-full h-48">
-                <img src={{supportingVisual.__image_url__}} alt={{supportingVisual.__image_prompt__}} className="w-full h-full object-cover rounded-lg" />
-              </div>
-            </div>
-          )}}
-          
-          {{showVisualAccents && (
-            <>
-              <div className="absolute top-8 right-8 w-6 h-6 bg-yellow-300 rounded-full"></div>
-              <div className="absolute bottom-12 left-8 w-4 h-4 bg-yellow-200 rounded-full"></div>
-            </>
-          )}}
-        </div>
-
-        <div className="w-1/2 relative bg-white px-16 py-12">
-          <div className="flex-1 px-8 pt-8">
-            <div className="flex items-center justify-end mb-4 space-x-4">
-              <div className="flex items-center space-x-2">
-                <div className="w-3 h-3 bg-yellow-300 rounded-full"></div>
-                <span className="text-sm text-gray-600">{{chartConfig.series1.label}}</span>
-              </div>
-            </div>
-            
-            {{chartData && chartData.length > 0 && (
-              <div className="h-64">
-                <ChartContainer config={{chartConfig}} className="h-full w-full">
-                  <LineChart data={{chartData}} margin={{{{ top: 10, right: 20, left: 0, bottom: 30 }}}}>
-                    <CartesianGrid strokeDasharray="3 3" stroke="#f0f0f0" />
-                    <XAxis dataKey="name" axisLine={{false}} tickLine={{false}} tick={{{{ fontSize: 12, fill: "#666" }}}} />
-                    <YAxis axisLine={{false}} tickLine={{false}} tick={{{{ fontSize: 12, fill: "#666" }}}} />
-                    <ChartTooltip content={{<ChartTooltipContent />}} />
-                    <Line type="monotone" dataKey="series1" stroke="#0e68b3" strokeWidth={{3}} dot={{{{ fill: "#0e68b3", strokeWidth: 2, r: 4 }}}} />
-                  </LineChart>
-                </ChartContainer>
-              </div>
-            )}}
-          </div>
-          
-          <div className="px-8 pb-6 space-y-4 mt-10">
-            {{bulletPoints && bulletPoints.map((point, index) => {{
-              const colors = ["bg-teal-600", "bg-yellow-300", "bg-gray-400"];
-              const dotColor = colors[index % colors.length];
-              return (
-                <div key={{index}} className="flex items-start space-x-4">
-                  <div className={{`w-6 h-6 ${{dotColor}} rounded-full flex-shrink-0 mt-1`}}></div>
-                  <p className="text-base leading-relaxed text-gray-700">{{point}}</p>
-                </div>
-              );
-            }})}}
-          </div>
-        </div>
-      </div>
-      <div className="absolute bottom-0 left-0 right-0 h-3 bg-yellow-300"></div>
-    </div>
-  );
-}};
-
-export default {safe_name}StatisticSlide;
-'''
+        # Known metrics use a template with their name fields already bound;
+        # substitute() ignores the fields such a template no longer has
+        template = _STATISTIC_SLIDE_BY_METRIC.get(metric_name, self.TEMPLATES["statistic"])
+        tsx_content = template.substitute(
+            name_fields,
+            statistic_value=metric.get('value', 'N/A'),
+            statistic_label=metric.get('label', metric_name),
+            kpi_prev_percent=kpi_prev_percent,
+            kpi_prev_label=kpi_prev_label,
+            kpi_yoy_percent=kpi_yoy_percent,
+            kpi_yoy_label=kpi_yoy_label,
+            bullet_points=bullet_points_str,
+            chart_data=chart_data_str,
+        )
         
         file_path = output_path / f"{safe_name}StatisticSlide.tsx"
-        file_path.write_text(tsx_content)
+        self._write_slide(file_path, tsx_content)
         print(f"  ✓ Created: {file_path}")
         return str(file_path)
     
-    def _generate_dual_chart_slide(self, data: Dict[str, Any], output_path: Path) -> str:
-        """Generate StatisticDualChartSlide.tsx for comparisons."""
+    def _generate_dual_chart_slide(
+        self,
+        data: Dict[str, Any],
+        output_path: Path,
+        downsample_to: int = 200,
+        prerender_svg: bool = True
+    ) -> str:
+        """
+        Generate StatisticDualChartSlide.tsx for comparisons.
+
+        Chronological area series longer than `downsample_to` points are
+        reduced with LTTB before being embedded; pass 0 to keep every point.
+        Bar data is categorical and always embedded whole. The default cap is
+        well above CANVAS_POINT_THRESHOLD, so long series still reach the
+        canvas renderer. With
+        `prerender_svg` the charts for the embedded data are drawn here as
+        static SVG, and recharts is only used if the data changes at runtime;
+        series longer than CANVAS_POINT_THRESHOLD are left to the canvas.
+        A boolean `use_canvas` in the comparisons dict forces the canvas
+        renderer on or off instead of choosing it by CANVAS_POINT_THRESHOLD;
+        no static SVG is prerendered when it is set.
+        """
         comparisons = data.get("comparisons", {})
+        period1 = comparisons.get("period1")
+        period2 = comparisons.get("period2")
+        use_canvas = comparisons.get("use_canvas")
+        if use_canvas is None:
+            canvas_point_threshold = self.CANVAS_POINT_THRESHOLD
+        else:
+            canvas_point_threshold = 0 if use_canvas else "Infinity"
+
+        bars = FinancialSeries.from_points(comparisons.get("bar_chart_data", []))
+        areas = FinancialSeries.from_points(comparisons.get("area_chart_data", []))
+        if downsample_to:
+            areas = areas.downsample(downsample_to)
+        bar_data_str = _dumps_json(bars.to_points())
+        area_data_str = _dumps_json(areas.to_points())
+        max_svg_points = self.CANVAS_POINT_THRESHOLD if prerender_svg and use_canvas is None else 0
+        bar_svg = _dumps_json(_render_bar_svg(bars)) if 0 < len(bars) <= max_svg_points else "null"
+        area_svg = _dumps_json(_render_area_svg(areas)) if 0 < len(areas) <= max_svg_points else "null"
         
-        bar_data_str = json.dumps(comparisons.get("bar_chart_data", []), indent=6)
-        area_data_str = json.dumps(comparisons.get("area_chart_data", []), indent=6)
+        tsx_content = self.TEMPLATES["comparison"].substitute(
+            canvas_point_threshold=canvas_point_threshold,
+            animation_point_threshold=self.ANIMATION_POINT_THRESHOLD,
+            bar_chart_data=bar_data_str,
+            area_chart_data=area_data_str,
+            bar_svg=bar_svg,
+            area_svg=area_svg,
+            previous_label=period1 or "Previous",
+            current_label=period2 or "Current",
+            period1_label=period1 or "Period 1",
+            period2_label=period2 or "Period 2",
+        )
         
-        tsx_content = f'''import React from "react";
-import * as z from "zod";
-import {{ ImageSchema }} from "../defaultSchemes";
-import {{ ChartContainer, ChartTooltip, ChartTooltipContent }} from "@/components/ui/chart";
-import {{ BarChart, Bar, AreaChart, Area, XAxis, YAxis, CartesianGrid }} from "recharts";
+        file_path = output_path / "FinancialComparisonSlide.tsx"
+        self._write_slide(file_path, tsx_content)
+        print(f"  ✓ Created: {file_path}")
 
-export const layoutName = "Financial Comparison";
-export const layoutId = "financial-comparison-slide";
-export const layoutDescription = "Period-over-period financial comparison";
+        lazy_path = output_path / "FinancialComparisonSlide.lazy.tsx"
+        self._write_slide(lazy_path, _LAZY_COMPARISON_SLIDE_TSX)
+        print(f"  ✓ Created: {lazy_path}")
 
-export const Schema = z.object({{
-  sectionTitle: z.string().default("PERIOD COMPARISON"),
-  organizationName: z.string().default("Financial Analysis"),
-  brandLogo: ImageSchema.default({{
-    __image_url__: "https://via.placeholder.com/40x40/14B8A6/FFFFFF?text=FA",
-    __image_prompt__: "Financial analytics logo"
-  }}),
-  barChartData: z.array(z.object({{
-    name: z.string(),
-    series1: z.number(),
-    series2: z.number(),
-    series3: z.number(),
-  }})).default({bar_data_str}),
-  areaChartData: z.array(z.object({{
-    name: z.string(),
-    series1: z.number(),
-    series2: z.number(),
-    series3: z.number(),
-  }})).default({area_data_str}),
-  leftChartTitle: z.string().default("{comparisons.get('period1', 'Previous')} vs {comparisons.get('period2', 'Current')}"),
-  leftChartDescription: z.string().default("Period-over-period comparison showing key financial metrics and their changes."),
-  rightChartTitle: z.string().default("Cumulative Trend Analysis"),
-  rightChartDescription: z.string().default("Progressive financial performance showing cumulative growth and trends over time."),
-}});
+        worker_path = output_path / "financialParser.worker.ts"
+        self._write_slide(worker_path, _FINANCIAL_PARSER_WORKER_TS)
+        print(f"  ✓ Created: {worker_path}")
+        return str(file_path)
 
-const chartConfig = {{
-  series1: {{ label: "{comparisons.get('period1', 'Period 1')}", color: "#061551" }},
-  series2: {{ label: "{comparisons.get('period2', 'Period 2')}", color: "#0e68b3" }},
-  series3: {{ label: "Change", color: "#32bbd8" }},
-}};
+    def write_slide_files(
+        self,
+        data: Dict[str, Any],
+        output_dir: str = "generated_slides",
+        output_archive: Optional[str] = None
+    ) -> List[str]:
+        """
+        Write every slide for parsed report data, plus the deck index.
 
-type SchemaType = z.infer<typeof Schema>;
+        Slides are rendered and written on a thread pool; each job is mostly
+        file I/O, which releases the GIL.
 
-const FinancialComparisonSlide = ({{ data }}: {{ data: Partial<SchemaType> }}) => {{
-  const {{ sectionTitle, organizationName, brandLogo, barChartData, areaChartData, leftChartTitle, leftChartDescription, rightChartTitle, rightChartDescription }} = data;
+        Args:
+            data: Parsed data returned by generate_financial_slides
+            output_dir: Directory to save generated slides
+            output_archive: If given, write the slides straight into this
+                zip file instead of output_dir
+        Returns:
+            Paths of the generated slide files, deck index last (member
+            names within the archive when output_archive is given)
+        """
+        self._report_timestamp = None
+        if output_archive:
+            output_path = Path()
+            self._archive = zipfile.ZipFile(output_archive, "w", compression=zipfile.ZIP_DEFLATED)
+        else:
+            output_path = Path(output_dir)
+            output_path.mkdir(parents=True, exist_ok=True)
+
+        jobs = [(self._generate_title_slide, data)]
+        jobs += [(self._generate_statistic_slide, metric) for metric in data.get("metrics", [])]
+        if data.get("comparisons"):
+            jobs.append((self._generate_dual_chart_slide, data))
 
-  return (
-    <div className="aspect-video max-w-[1280px] w-full bg-white relative overflow-hidden">
-      <div className="h-20 bg-teal-600 px-16 py-4 flex justify-between items-center">
-        {{sectionTitle && <h1 className="text-4xl font-black text-white">{{sectionTitle}}</h1>}}
-        <div className="flex items-center space-x-3">
-          {{brandLogo?.__image_url__ && <div className="w-8 h-8"><img src={{brandLogo.__image_url__}} alt={{brandLogo.__image_prompt__}} className="w-full h-full object-contain" /></div>}}
-          {{organizationName && <span className="text-lg font-bold text-white">{{organizationName}}</span>}}
-        </div>
-      </div>
+        try:
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                futures = [executor.submit(job, arg, output_path) for job, arg in jobs]
+                slide_files = [future.result() for future in futures]
+
+            slide_files.append(self.generate_deck_index(slide_files))
+        finally:
+            if self._archive is not None:
+                self._archive.close()
+                self._archive = None
+        return slide_files
+
+    def _write_slide(self, file_path: Path, tsx_content: str) -> None:
+        """Write one generated file to disk, or into the open output archive."""
+        if self._archive is None:
+            _write_tsx(file_path, tsx_content)
+            return
+        with self._archive_lock:
+            self._archive.writestr(file_path.as_posix(), tsx_content)
+
+    def generate_deck_index(self, slide_files: List[str]) -> str:
+        """
+        Generate SlidesDeck.tsx, a virtualized list of the given slide files.
 
-      <div className="flex-1 h-[calc(100%-80px)] flex">
-        <div className="w-1/2 p-8 bg-gray-50 flex flex-col">
-          <div className="flex items-center justify-start mb-4 space-x-4">
-            <div className="flex items-center space-x-2">
-              <div className="w-3 h-3 bg-teal-600 rounded-full"></div>
-              <span className="text-sm text-gray-600">{{chartConfig.series1.label}}</span>
-            </div>
-            <div className="flex items-center space-x-2">
-              <div className="w-3 h-3 bg-green-400 rounded-full"></div>
-              <span className="text-sm text-gray-600">{{chartConfig.series2.label}}</span>
-            </div>
-          </div>
+        Only the slide in view plus one slide of overscan on either side is
+        mounted; everything further away is unmounted by react-window, and
+        each slide module is code-split with React.lazy.
 
-          {{barChartData && barChartData.length > 0 && (
-            <div className="flex-1 mb-6">
-              <ChartContainer config={{chartConfig}} className="h-full w-full">
-                <BarChart data={{barChartData}} margin={{{{ top: 10, right: 20, left: 0, bottom: 30 }}}} barCategoryGap="20%">
-                  <CartesianGrid strokeDasharray="3 3" stroke="#f0f0f0" />
-                  <XAxis dataKey="name" axisLine={{false}} tickLine={{false}} tick={{{{ fontSize: 12, fill: "#666" }}}} />
-                  <YAxis axisLine={{false}} tickLine={{false}} tick={{{{ fontSize: 12, fill: "#666" }}}} />
-                  <ChartTooltip content={{<ChartTooltipContent />}} />
-                  <Bar dataKey="series1" fill="#061551" radius={{[2, 2, 0, 0]}} barSize={{15}} />
-                  <Bar dataKey="series2" fill="#0e68b3" radius={{[2, 2, 0, 0]}} barSize={{15}} />
-                </BarChart>
-              </ChartContainer>
-            </div>
-          )}}
+        Args:
+            slide_files: Paths returned by the _generate_*_slide methods
+        Returns:
+            Path of the generated deck file
+        """
+        output_path = Path(slide_files[0]).parent
+        slide_imports = "\n".join(
+            f'  lazySlide(() => import("./{Path(f).stem}")),' for f in slide_files
+        )
 
-          <div className="space-y-3">
-            {{leftChartTitle && <h3 className="text-xl font-bold text-gray-900">{{leftChartTitle}}</h3>}}
-            {{leftChartDescription && <p className="text-base leading-relaxed text-gray-700">{{leftChartDescription}}</p>}}
-          </div>
-        </div>
+        tsx_content = f'''import React, {{ Suspense }} from "react";
+import {{ FixedSizeList, ListChildComponentProps }} from "react-window";
 
-        <div className="w-1/2 p-8 bg-white flex flex-col">
-          <div className="flex items-center justify-end mb-4 space-x-4">
-            <div className="flex items-center space-x-2">
-              <div className="w-3 h-3 bg-teal-600 rounded-full"></div>
-              <span className="text-sm text-gray-600">Trend</span>
-            </div>
-          </div>
+type SlideModule = {{
+  default: React.ElementType;
+  Schema: {{ parse: (value: unknown) => any }};
+}};
 
-          {{areaChartData && areaChartData.length > 0 && (
-            <div className="flex-1 mb-6">
-              <ChartContainer config={{chartConfig}} className="h-full w-full">
-                <AreaChart data={{areaChartData}} margin={{{{ top: 10, right: 20, left: 0, bottom: 30 }}}}>
-                  <CartesianGrid strokeDasharray="3 3" stroke="#f0f0f0" />
-                  <XAxis dataKey="name" axisLine={{false}} tickLine={{false}} tick={{{{ fontSize: 12, fill: "#666" }}}} />
-                  <YAxis axisLine={{false}} tickLine={{false}} tick={{{{ fontSize: 12, fill: "#666" }}}} />
-                  <ChartTooltip content={{<ChartTooltipContent />}} />
-                  <Area type="monotone" dataKey="series1" stackId="1" stroke="#061551" fill="#061551" fillOpacity={{0.8}} />
-                  <Area type="monotone" dataKey="series2" stackId="1" stroke="#0e68b3" fill="#0e68b3" fillOpacity={{0.8}} />
-                </AreaChart>
-              </ChartContainer>
-            </div>
-          )}}
+// Each slide renders with its own schema defaults, i.e. the generated data.
+const lazySlide = (load: () => Promise<SlideModule>) =>
+  React.lazy(() => load().then((m) => ({{ default: () => <m.default data={{m.Schema.parse({{}})}} /> }})));
 
-          <div className="space-y-3">
-            {{rightChartTitle && <h3 className="text-xl font-bold text-gray-900">{{rightChartTitle}}</h3>}}
-            {{rightChartDescription && <p className="text-base leading-relaxed text-gray-700">{{rightChartDescription}}</p>}}
-          </div>
-        </div>
-      </div>
+const SLIDES = [
+{slide_imports}
+];
+
+const SLIDE_WIDTH = 1280;
+const SLIDE_HEIGHT = 720;
+
+const SlideRow = ({{ index, style }}: ListChildComponentProps) => {{
+  const Slide = SLIDES[index];
+  return (
+    <div style={{style}}>
+      <Suspense fallback={{<div className="aspect-video max-w-[1280px] w-full bg-gray-100 animate-pulse" />}}>
+        <Slide />
+      </Suspense>
     </div>
   );
 }};
 
-export default FinancialComparisonSlide;
+const SlidesDeck = ({{ height = SLIDE_HEIGHT }}: {{ height?: number }}) => (
+  <FixedSizeList height={{height}} width={{SLIDE_WIDTH}} itemCount={{SLIDES.length}} itemSize={{SLIDE_HEIGHT}} overscanCount={{1}}>
+    {{SlideRow}}
+  </FixedSizeList>
+);
+
+export default SlidesDeck;
 '''
-        
-        file_path = output_path / "FinancialComparisonSlide.tsx"
-        file_path.write_text(tsx_content)
+
+        file_path = output_path / "SlidesDeck.tsx"
+        self._write_slide(file_path, tsx_content)
         print(f"  ✓ Created: {file_path}")
         return str(file_path)
 
@@ -1650,10 +2643,12 @@ CashFlow Analysis
     generator = FinancialTSXGenerator()
     
     try:
-        files = generator.generate_financial_slides(
+        data = generator.generate_financial_slides(
             financial_text=financial_text,
-            output_dir="generated_financial_slides"
+            output_dir="generated_financial_slides",
+            write_title_early=True
         )
+        files = generator.write_slide_files(data, "generated_financial_slides")
         
         print("\n" + "=" * 80)
         print("✅ TSX Slides Generated Successfully!".center(80))
@@ -2,9 +2,13 @@
 AI service module for handling API interactions with multiple providers.
 Supports OpenAI and DeepSeek with easy switching.
 """
+import asyncio
+import json
+import threading
 import time
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
+from typing import AsyncIterator, List, Dict, Any, Optional, Type
+from openai import AsyncOpenAI, OpenAI
+from pydantic import BaseModel
 from config import config
 
 
@@ -16,28 +20,58 @@ class AIService:
         config.validate()
         self.provider = config.provider
         self.model = config.get_model()
+        self.extraction_model = config.extraction_model or self.model
         self.temperature = config.temperature
         self.max_tokens = config.max_tokens
+        self.max_concurrent_requests = config.max_concurrent_requests
+        self.structured_output = config.structured_output
+
+        # Async client state is created per event loop, see _async_client_for_loop
+        self._async_client: Optional[AsyncOpenAI] = None
+        self._async_semaphore: Optional[asyncio.Semaphore] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
 
         if self.provider == "openai":
-            self.client = OpenAI(api_key=config.get_api_key())
+            self._client_kwargs: Dict[str, Any] = {
+                "api_key": config.get_api_key(),
+                "max_retries": config.max_retries,
+            }
+            self.client = OpenAI(**self._client_kwargs)
             print(f"🤖 Initialized OpenAI client with model: {self.model}")
         elif self.provider in ("deepseek", "groq"):
-            self.client = OpenAI(
-                api_key=config.get_api_key(),
-                base_url=config.get_base_url()
-            )
+            self._client_kwargs = {
+                "api_key": config.get_api_key(),
+                "base_url": config.get_base_url(),
+                "max_retries": config.max_retries,
+            }
+            self.client = OpenAI(**self._client_kwargs)
             icon = "🧠" if self.provider == "deepseek" else "⚡"
             print(f"{icon} Initialized {self.provider.title()} client with model: {self.model}")
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
 
+    @staticmethod
+    def _cached_prompt_tokens(usage: Any) -> int:
+        """
+        Number of input tokens served from the provider's prompt prefix cache.
+
+        OpenAI reports them under prompt_tokens_details.cached_tokens, DeepSeek
+        as prompt_cache_hit_tokens; providers without caching report neither.
+        """
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) if details else None
+        if cached is None:
+            cached = getattr(usage, "prompt_cache_hit_tokens", None)
+        return cached or 0
+
     def generate_completion(
         self,
         messages: List[Dict[str, str]],
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
         json_mode: bool = False,
+        response_model: Optional[Type[BaseModel]] = None,
+        model: Optional[str] = None,
     ) -> str:
         """
         Generate a completion using the configured AI provider.
@@ -47,47 +81,319 @@ class AIService:
             temperature: Override temperature (None uses config value; 0 is valid).
             max_tokens: Override max_tokens.
             json_mode: If True, enforce JSON output via response_format.
+            response_model: Pydantic model the response must conform to; uses
+                strict structured output when STRUCTURED_OUTPUT is enabled.
+            model: Override the configured model for this call.
 
         Returns:
             Generated text response.
         """
         try:
-            # Fix: use explicit None check so temperature=0 is honoured
-            resolved_temp = temperature if temperature is not None else self.temperature
+            params = self._completion_params(messages, temperature, max_tokens, json_mode, response_model, model)
 
-            params: Dict[str, Any] = {
-                "model": self.model,
-                "messages": messages,
-                "temperature": resolved_temp,
-            }
+            start_time = time.time()
+            print(f"🔄 Generating completion with {self.provider} ({params['model']})...")
 
-            if max_tokens or self.max_tokens:
-                params["max_tokens"] = max_tokens if max_tokens is not None else self.max_tokens
+            response = self.client.chat.completions.create(**params)
 
-            if json_mode:
-                params["response_format"] = {"type": "json_object"}
+            self._log_usage(response, time.time() - start_time)
+            return response.choices[0].message.content
 
-            start_time = time.time()
-            print(f"🔄 Generating completion with {self.provider} ({self.model})...")
+        except Exception as e:
+            print(f"❌ Error with {self.provider}: {str(e)}")
+            raise Exception(f"Error generating completion with {self.provider}: {str(e)}")
 
-            response = self.client.chat.completions.create(**params)
+    async def generate_completion_async(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False,
+        response_model: Optional[Type[BaseModel]] = None,
+        model: Optional[str] = None,
+    ) -> str:
+        """
+        Async counterpart of generate_completion built on AsyncOpenAI.
 
-            elapsed = time.time() - start_time
+        At most `max_concurrent_requests` calls are in flight at once per
+        event loop, to stay within provider rate limits.
 
-            if hasattr(response, "usage") and response.usage:
-                print(
-                    f"📊 Token usage: {response.usage.prompt_tokens} in + "
-                    f"{response.usage.completion_tokens} out = {response.usage.total_tokens} total"
-                )
-                print(
-                    f"⚡ Response time: {elapsed:.2f}s "
-                    f"({response.usage.total_tokens / elapsed:.0f} tokens/sec)"
-                )
-            else:
-                print(f"⚡ Response time: {elapsed:.2f}s")
+        Args:
+            messages: List of message dicts with 'role' and 'content'.
+            temperature: Override temperature (None uses config value; 0 is valid).
+            max_tokens: Override max_tokens.
+            json_mode: If True, enforce JSON output via response_format.
+            response_model: Pydantic model the response must conform to; uses
+                strict structured output when STRUCTURED_OUTPUT is enabled.
+            model: Override the configured model for this call.
+
+        Returns:
+            Generated text response.
+        """
+        try:
+            params = self._completion_params(messages, temperature, max_tokens, json_mode, response_model, model)
+            client, semaphore = self._async_client_for_loop()
 
+            async with semaphore:
+                start_time = time.time()
+                print(f"🔄 Generating completion with {self.provider} ({params['model']})...")
+
+                response = await client.chat.completions.create(**params)
+
+            self._log_usage(response, time.time() - start_time)
             return response.choices[0].message.content
 
         except Exception as e:
             print(f"❌ Error with {self.provider}: {str(e)}")
             raise Exception(f"Error generating completion with {self.provider}: {str(e)}")
+
+    async def stream_completion_async(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False,
+        response_model: Optional[Type[BaseModel]] = None,
+        model: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a completion, yielding content deltas as they arrive.
+
+        Takes the same arguments as generate_completion_async and shares its
+        concurrency limit; the slot is held until the stream is exhausted or
+        the caller closes the generator.
+
+        Yields:
+            Text fragments of the response, in order.
+        """
+        try:
+            params = self._completion_params(messages, temperature, max_tokens, json_mode, response_model, model)
+            params["stream"] = True
+            client, semaphore = self._async_client_for_loop()
+
+            async with semaphore:
+                start_time = time.time()
+                print(f"🔄 Streaming completion with {self.provider} ({params['model']})...")
+
+                stream = await client.chat.completions.create(**params)
+                try:
+                    async for chunk in stream:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+                finally:
+                    # Also releases the connection when the caller stops early
+                    await stream.close()
+
+            print(f"⚡ Stream finished in {time.time() - start_time:.2f}s")
+
+        except Exception as e:
+            print(f"❌ Error with {self.provider}: {str(e)}")
+            raise Exception(f"Error generating completion with {self.provider}: {str(e)}")
+
+    def run_batch(
+        self,
+        requests: List[List[Dict[str, str]]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False,
+        response_model: Optional[Type[BaseModel]] = None,
+        model: Optional[str] = None,
+        poll_interval: float = 60.0,
+    ) -> List[Optional[str]]:
+        """
+        Run many completions as one job on the provider's Batch API.
+
+        Batch jobs cost half as much per token and do not count against the
+        per-minute rate limits, but may take up to 24 hours to finish, so this
+        is meant for offline work such as nightly report regeneration. Blocks
+        until the batch is done.
+
+        Args:
+            requests: One list of message dicts per completion.
+            temperature: Override temperature for every request.
+            max_tokens: Override max_tokens for every request.
+            json_mode: If True, enforce JSON output via response_format.
+            response_model: Pydantic model every response must conform to.
+            model: Override the configured model for every request.
+            poll_interval: Seconds to wait between batch status checks.
+
+        Returns:
+            Generated text per request, in order; None where a request failed.
+        """
+        if self.provider not in ("openai", "groq"):
+            raise ValueError(f"Batch API not supported by provider: {self.provider}")
+        if not requests:
+            return []
+
+        try:
+            lines = [
+                json.dumps({
+                    "custom_id": str(i),
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": self._completion_params(
+                        messages, temperature, max_tokens, json_mode, response_model, model
+                    ),
+                })
+                for i, messages in enumerate(requests)
+            ]
+            batch_file = self.client.files.create(
+                file=("batch.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch"
+            )
+            batch = self.client.batches.create(
+                input_file_id=batch_file.id, endpoint="/v1/chat/completions", completion_window="24h"
+            )
+            start_time = time.time()
+            print(f"📦 Submitted batch {batch.id} with {len(requests)} requests to {self.provider} ({model or self.model})...")
+
+            while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                time.sleep(poll_interval)
+                batch = self.client.batches.retrieve(batch.id)
+            print(f"📦 Batch {batch.id} {batch.status} after {time.time() - start_time:.0f}s")
+
+            # Expired or cancelled batches still report the requests that finished
+            results: List[Optional[str]] = [None] * len(requests)
+            if batch.output_file_id:
+                for line in self.client.files.content(batch.output_file_id).text.splitlines():
+                    item = json.loads(line)
+                    body = (item.get("response") or {}).get("body") or {}
+                    if body.get("choices"):
+                        results[int(item["custom_id"])] = body["choices"][0]["message"]["content"]
+            return results
+
+        except Exception as e:
+            print(f"❌ Error with {self.provider}: {str(e)}")
+            raise Exception(f"Error running batch with {self.provider}: {str(e)}")
+
+    async def aclose(self) -> None:
+        """Close the sync and async HTTP clients and their pooled connections."""
+        self.client.close()
+        if self._async_client is not None and self._async_loop is asyncio.get_running_loop():
+            await self._async_client.close()
+        self._async_client = None
+        self._async_semaphore = None
+        self._async_loop = None
+
+    def _async_client_for_loop(self):
+        """
+        Return the AsyncOpenAI client and request semaphore for the running loop.
+
+        httpx connection pools and asyncio semaphores are bound to the loop
+        they were first used on, so both are recreated when a new loop (e.g. a
+        later asyncio.run call) starts using this service.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_client = AsyncOpenAI(**self._client_kwargs)
+            self._async_semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+            self._async_loop = loop
+        return self._async_client, self._async_semaphore
+
+    def _completion_params(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        json_mode: bool,
+        response_model: Optional[Type[BaseModel]] = None,
+        model: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Build chat.completions.create arguments shared by the sync and async paths."""
+        # Fix: use explicit None check so temperature=0 is honoured
+        resolved_temp = temperature if temperature is not None else self.temperature
+
+        params: Dict[str, Any] = {
+            "model": model or self.model,
+            "messages": messages,
+            "temperature": resolved_temp,
+        }
+
+        if max_tokens or self.max_tokens:
+            params["max_tokens"] = max_tokens if max_tokens is not None else self.max_tokens
+
+        if response_model is not None and self.provider == "openai" and self.structured_output:
+            params["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": response_model.__name__,
+                    "schema": _strict_json_schema(response_model.model_json_schema()),
+                    "strict": True,
+                },
+            }
+        elif json_mode or (response_model is not None and self.provider != "openai"):
+            # DeepSeek and Groq only offer plain JSON mode; OpenAI models without
+            # structured outputs (e.g. gpt-4) get plain output, validated by the caller
+            params["response_format"] = {"type": "json_object"}
+
+        return params
+
+    def _log_usage(self, response: Any, elapsed: float) -> None:
+        """Print token usage, throughput and prompt-cache hits for a response."""
+        if hasattr(response, "usage") and response.usage:
+            print(
+                f"📊 Token usage: {response.usage.prompt_tokens} in + "
+                f"{response.usage.completion_tokens} out = {response.usage.total_tokens} total"
+            )
+            print(
+                f"⚡ Response time: {elapsed:.2f}s "
+                f"({response.usage.total_tokens / elapsed:.0f} tokens/sec)"
+            )
+            cached_tokens = self._cached_prompt_tokens(response.usage)
+            if cached_tokens:
+                print(f"♻️  Prompt cache hit: {cached_tokens} of {response.usage.prompt_tokens} input tokens")
+        else:
+            print(f"⚡ Response time: {elapsed:.2f}s")
+
+
+def _strict_json_schema(schema: Any) -> Any:
+    """
+    Adapt a pydantic JSON schema to OpenAI's strict structured-output subset.
+
+    Strict mode requires every property to be listed as required and objects
+    to forbid extra keys, and rejects "default"; optional fields stay
+    optional through their nullable types.
+    """
+    if isinstance(schema, list):
+        return [_strict_json_schema(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    strict: Dict[str, Any] = {}
+    for key, value in schema.items():
+        if key in ("properties", "$defs"):
+            # Mappings of names to sub-schemas; the names themselves are kept
+            strict[key] = {name: _strict_json_schema(sub) for name, sub in value.items()}
+        elif key != "default":
+            strict[key] = _strict_json_schema(value)
+    if strict.get("type") == "object" and "properties" in strict:
+        strict["required"] = list(strict["properties"])
+        strict["additionalProperties"] = False
+    return strict
+
+
+# ── Shared instance ──────────────────────────────────────────────────────────
+
+_shared_service: Optional[AIService] = None
+_shared_service_lock = threading.Lock()
+
+
+def get_ai_service() -> AIService:
+    """
+    Return the process-wide AIService, creating it on first use.
+
+    Every caller shares one client and therefore one pool of keep-alive
+    connections, instead of paying a new TCP/TLS handshake per AIService.
+    """
+    global _shared_service
+    if _shared_service is None:
+        with _shared_service_lock:
+            if _shared_service is None:
+                _shared_service = AIService()
+    return _shared_service
+
+
+async def close_ai_service() -> None:
+    """Close and forget the shared AIService (e.g. on application shutdown)."""
+    global _shared_service
+    if _shared_service is not None:
+        await _shared_service.aclose()
+        _shared_service = None